@@ -0,0 +1,121 @@
+# db_viewer/analytics.py
+"""Class-wide grade statistics, computed in SQLite and cached until the data changes.
+
+Student averages come from the generated students.average column, so a
+NULL grade is missing and 0 is a real grade everywhere.
+"""
+import math
+
+try:
+    from .database import connection, read_cache, DB_STUDENTS, SUBJECTS
+except ImportError:
+    from database import connection, read_cache, DB_STUDENTS, SUBJECTS
+
+STAT_COLUMNS = SUBJECTS + ["average"]
+PERCENTILES = (25, 50, 75, 90)
+TOP_STUDENTS = 10
+
+# the card colour bands: (label, lowest grade, colour)
+BANDS = (("90+", 90, "#10b981"), ("80-89", 80, "#3b82f6"), ("70-79", 70, "#f59e0b"), ("<70", None, "#ef4444"))
+NO_GRADE_COLOR = "#94a3b8"
+
+
+def _band(grade):
+    for band in BANDS:
+        if band[1] is None or grade >= band[1]:
+            return band
+
+
+def band_color(grade):
+    return NO_GRADE_COLOR if grade is None else _band(grade)[2]
+
+
+def band_label(grade):
+    return "—" if grade is None else _band(grade)[0]
+
+
+def fmt_grade(value):
+    return "—" if value is None else f"{value:.1f}"
+
+
+def mean_grade(grades):
+    """Average of the grades that are present (None is missing), or None"""
+    present = [g for g in grades if g is not None]
+    return sum(present) / len(present) if present else None
+
+
+# ==================== AGGREGATES ====================
+def _band_sums(col):
+    bounds = [low for _, low, _ in BANDS]
+    sums = []
+    for i, low in enumerate(bounds):
+        upper = bounds[i - 1] if i else None
+        cond = [f"{col} >= {low}" if low is not None else f"{col} IS NOT NULL"]
+        if upper is not None:
+            cond.append(f"{col} < {upper}")
+        sums.append(f"TOTAL({' AND '.join(cond)})")
+    return sums
+
+
+def _percentile(conn, col, count, p):
+    """Linearly interpolated percentile, read off the column's index"""
+    rank = p / 100 * (count - 1)
+    offset = int(rank)
+    values = [v for (v,) in conn.execute(
+        f"SELECT {col} FROM students WHERE {col} IS NOT NULL ORDER BY {col} LIMIT 2 OFFSET ?", (offset,))]
+    if len(values) == 1:
+        return values[0]
+    return values[0] + (values[1] - values[0]) * (rank - offset)
+
+
+def compute_summary(conn=None):
+    """Per-column count/mean/stdev/min/max/percentiles/bands plus the top students.
+
+    One aggregate scan covers every column; percentiles are index seeks.
+    Pass conn to read inside a transaction the caller already has open."""
+    if conn is None:
+        with connection(DB_STUDENTS) as conn:
+            return compute_summary(conn)
+
+    per_col = 5 + len(BANDS)
+    select = []
+    for col in STAT_COLUMNS:
+        select += [f"COUNT({col})", f"AVG({col})", f"AVG({col} * {col})", f"MIN({col})", f"MAX({col})"]
+        select += _band_sums(col)
+
+    row = conn.execute(f"SELECT COUNT(*), {', '.join(select)} FROM students").fetchone()
+    columns = {}
+    for i, col in enumerate(STAT_COLUMNS):
+        count, mean, mean_sq, low, high, *bands = row[1 + i * per_col:1 + (i + 1) * per_col]
+        stats = {"count": count, "mean": mean, "min": low, "max": high,
+                 "stdev": math.sqrt(max(mean_sq - mean * mean, 0.0)) if count else None,
+                 "bands": [int(b) for b in bands]}
+        for p in PERCENTILES:
+            stats[f"p{p}"] = _percentile(conn, col, count, p) if count else None
+        stats["median"] = stats["p50"]
+        columns[col] = stats
+    top = conn.execute("""SELECT id, name, surname, average FROM students
+                          WHERE average IS NOT NULL ORDER BY average DESC, id LIMIT ?""",
+                       (TOP_STUDENTS,)).fetchall()
+
+    # competition ranking (1, 2, 2, 4) within the top list
+    ranked = []
+    for i, (sid, name, surname, avg) in enumerate(top):
+        rank = ranked[-1][0] if ranked and ranked[-1][4] == avg else i + 1
+        ranked.append((rank, sid, name, surname, avg))
+    return {"students": row[0], "columns": columns, "top": ranked}
+
+
+def student_rank(student_id):
+    """(rank, ranked students) by average, or None if the student has no grades"""
+    with connection(DB_STUDENTS) as conn:
+        return conn.execute("""SELECT 1 + (SELECT COUNT(*) FROM students WHERE average > s.average),
+                                      (SELECT COUNT(average) FROM students)
+                               FROM students s WHERE id=? AND average IS NOT NULL""",
+                            (student_id,)).fetchone()
+
+
+def class_summary():
+    """compute_summary(), served from the students read cache until the data
+    changes; blocking on a miss, so call it off the UI thread"""
+    return read_cache(DB_STUDENTS).get(("summary",), compute_summary)
@@ -0,0 +1,280 @@
+# db_viewer/api.py
+"""Local JSON HTTP API over students.db / users.db for scripts and headless clients.
+
+    python api.py --port 8080
+
+    POST /login                   {"username", "password"} -> {"token", "role", "profile"}
+    GET  /students                ?q=&column=&low=&high=&offset=0&limit=50
+    GET  /students/<id>
+    PUT  /students/<id>/grades    {"math": 91, "art": null}
+    POST /grades                  {"<id>": {"math": 91}, ...}, one transaction
+    GET  /health
+
+Everything but /login and /health needs "Authorization: Bearer <token>".
+Students may only read their own record; listing and writes are admin-only.
+Connections are kept alive (HTTP/1.1) and each request is logged as a JSON line.
+"""
+import argparse
+import json
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    from .database import (init_databases, login, get_student, student_pager, update_grades_many,
+                           set_pool_size, close_all, SUBJECTS, FILTER_COLUMNS)
+    from .tracing import JsonLinesLog, enable_from_env, TRACER
+except ImportError:
+    from database import (init_databases, login, get_student, student_pager, update_grades_many,
+                          set_pool_size, close_all, SUBJECTS, FILTER_COLUMNS)
+    from tracing import JsonLinesLog, enable_from_env, TRACER
+
+LOG_FILE = "api_requests.jsonl"
+SESSION_TTL = 8 * 3600
+MAX_BODY = 1 << 20
+MAX_LIMIT = 500
+LIST_COLUMNS = ["id", "name", "surname", "email"] + SUBJECTS + ["average"]
+PROFILE_FIELDS = ["name", "surname"] + SUBJECTS
+
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==================== SESSIONS ====================
+class Sessions:
+    """Bearer tokens handed out by /login, kept in memory"""
+
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def create(self, username, role):
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self._lock:
+            # tokens that are never looked up again are dropped here; the scan is cheap next to the KDF
+            for expired in [t for t, session in self._tokens.items() if session[2] < now]:
+                del self._tokens[expired]
+            self._tokens[token] = (username, role, now + self.ttl)
+        return token
+
+    def get(self, token):
+        with self._lock:
+            session = self._tokens.get(token)
+            if session and session[2] < time.monotonic():
+                del self._tokens[token]
+                session = None
+        return session and session[:2]
+
+
+# ==================== HANDLERS ====================
+def _grade(value):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+        raise APIError(400, f"grade {value!r} must be a number from 0 to 100 or null")
+    return float(value)
+
+
+def _grade_cells(cells):
+    if not isinstance(cells, dict) or not cells:
+        raise APIError(400, "expected an object of subject: grade")
+    unknown = set(cells) - set(SUBJECTS)
+    if unknown:
+        raise APIError(400, f"unknown subjects: {', '.join(sorted(unknown))}")
+    return {subject: _grade(value) for subject, value in cells.items()}
+
+
+def _number(params, name, default=None, cast=float):
+    try:
+        return cast(params[name][0]) if name in params else default
+    except ValueError:
+        raise APIError(400, f"{name} must be a number")
+
+
+def post_login(request, body):
+    if not isinstance(body, dict) or not body.get("username") or not body.get("password"):
+        raise APIError(400, "username and password are required")
+    username = str(body["username"])
+    account = login(username, str(body["password"]))
+    if account is None:
+        raise APIError(401, "wrong username or password")
+    role, profile = account
+    return {"token": request.server.sessions.create(username, role), "role": role,
+            "profile": dict(zip(PROFILE_FIELDS, profile)) if profile else None}
+
+
+def get_students(request, params):
+    request.require_admin()
+    column = params.get("column", [None])[0]
+    if column is not None and column not in FILTER_COLUMNS:
+        raise APIError(400, f"column must be one of {', '.join(FILTER_COLUMNS)}")
+    offset = max(0, _number(params, "offset", 0, int))
+    limit = min(max(1, _number(params, "limit", 50, int)), MAX_LIMIT)
+    pager = student_pager(LIST_COLUMNS, text=params.get("q", [""])[0], column=column,
+                          low=_number(params, "low"), high=_number(params, "high"))
+    rows = pager.fetch(offset, limit)
+    return {"total": pager.count(), "offset": offset,
+            "students": [dict(zip(LIST_COLUMNS, values)) for _, values in rows]}
+
+
+def get_one_student(request, student_id):
+    username, role = request.user
+    if role != "admin" and username != student_id:
+        raise APIError(403, "students can only read their own record")
+    row = get_student(student_id)
+    if row is None:
+        raise APIError(404, f"no student {student_id}")
+    return {"id": student_id, **dict(zip(PROFILE_FIELDS, row))}
+
+
+def put_grades(request, body, student_id):
+    request.require_admin()
+    if not update_grades_many({student_id: _grade_cells(body)}):
+        raise APIError(404, f"no student {student_id}")
+    return get_one_student(request, student_id)
+
+
+def post_grades(request, body):
+    request.require_admin()
+    if not isinstance(body, dict) or not body:
+        raise APIError(400, "expected an object of student id: {subject: grade}")
+    changes = {str(sid): _grade_cells(cells) for sid, cells in body.items()}
+    return {"updated": update_grades_many(changes), "requested": len(changes)}
+
+
+# (method, path pattern, handler, takes a JSON body, needs a session)
+ROUTES = [
+    ("POST", re.compile(r"/login"), post_login, True, False),
+    ("GET", re.compile(r"/health"), lambda request, params: {"ok": True}, False, False),
+    ("GET", re.compile(r"/students"), get_students, False, True),
+    ("GET", re.compile(r"/students/([^/]+)"), lambda request, params, sid: get_one_student(request, sid), False, True),
+    ("PUT", re.compile(r"/students/([^/]+)/grades"), put_grades, True, True),
+    ("POST", re.compile(r"/grades"), post_grades, True, True),
+]
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive; every response carries Content-Length
+    disable_nagle_algorithm = True      # headers and body go out as separate writes
+    server_version = "StudentManagerAPI/1.0"
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def log_message(self, format, *args):
+        pass                            # requests go to the JSONL log instead
+
+    def require_admin(self):
+        if self.user[1] != "admin":
+            raise APIError(403, "admin only")
+
+    def dispatch(self, method):
+        start = time.perf_counter()
+        self.user = None
+        url = urlsplit(self.path)
+        try:
+            self.body = self.read_body()
+            status, result = 200, self.route(method, url)
+        except APIError as e:
+            status, result = e.status, {"error": str(e)}
+        except Exception as e:
+            status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+        payload = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.log.log({"ts": time.time(), "method": method, "path": url.path, "status": status,
+                             "ms": round((time.perf_counter() - start) * 1000, 3), "bytes": len(payload),
+                             "client": self.client_address[0], "user": self.user and self.user[0]})
+
+    def route(self, method, url):
+        allowed = False
+        for route_method, pattern, handler, takes_body, needs_session in ROUTES:
+            match = pattern.fullmatch(url.path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            body = self.parse_body() if takes_body else parse_qs(url.query)
+            if needs_session:
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+                self.user = self.server.sessions.get(token)
+                if self.user is None:
+                    raise APIError(401, "missing or expired token")
+            return handler(self, body, *match.groups())
+        raise APIError(405 if allowed else 404, "method not allowed" if allowed else "not found")
+
+    def read_body(self):
+        # always drained before routing, so a failed request leaves keep-alive in sync
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise APIError(413, "request body too large")
+        return self.rfile.read(length)
+
+    def parse_body(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            raise APIError(400, "body is not valid JSON")
+
+
+class APIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, log_path=LOG_FILE):
+        super().__init__(address, APIHandler)
+        self.sessions = Sessions()
+        self.log = JsonLinesLog(log_path)
+
+    def server_close(self):
+        super().server_close()
+        self.log.close()
+
+
+def serve(host="127.0.0.1", port=8080, log_path=LOG_FILE, pool_size=16):
+    """Runs the API until interrupted"""
+    enable_from_env()
+    init_databases()
+    set_pool_size(pool_size)           # one idle connection per busy request thread
+    server = APIServer((host, port), log_path)
+    print(f"Serving on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        close_all()
+        TRACER.disable()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON HTTP API over students.db / users.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--log", default=LOG_FILE, help="JSONL request log (default: %(default)s)")
+    parser.add_argument("--pool-size", type=int, default=16, help="pooled connections kept per database")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.log, args.pool_size)
+
+
+if __name__ == "__main__":
+    main()
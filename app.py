@@ -1,11 +1,20 @@
 # db_viewer/app.py
+import functools
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
-from .database import get_table_data, DB_STUDENTS, DB_USERS
-from .widgets import setup_treeview
+from tkinter import ttk, messagebox, filedialog
+from .database import sorted_pager, ChangeFeed, close_all, DB_STUDENTS, DB_USERS
+from .widgets import PagedTreeview, FilterBar, TraceOverlay
+from .tracing import traced, enable_from_env, TRACER
+from .executor import BackgroundExecutor
+from .photos import ThumbnailCache
+from .exporter import export_table
+
+LIVE_POLL_MS = 1000
 
 class DBViewerApp:
     def __init__(self):
+        enable_from_env()         # $STUDENT_TRACE=trace.jsonl; F12 shows the hot spots
         self.root = tk.Tk()
         self.root.title("DB Viewer - Student Manager Pro")
         self.root.geometry("1300x900")
@@ -24,47 +33,183 @@ class DBViewerApp:
         db_combo = ttk.Combobox(control_frame, textvariable=self.db_var,
                                 values=[DB_STUDENTS, DB_USERS], state="readonly", font=("Helvetica", 16), width=20)
         db_combo.pack(side="left", padx=10)
+        db_combo.bind("<<ComboboxSelected>>", lambda e: self.switch_db())
 
         tk.Button(control_frame, text="Refresh Data", bg="#3b82f6", fg="white",
                   font=("Helvetica", 16, "bold"), command=self.refresh, padx=30, pady=12).pack(side="left", padx=30)
 
-        # Treeview
-        self.tree = setup_treeview(self.root)
+        tk.Button(control_frame, text="Export…", bg="#10b981", fg="white",
+                  font=("Helvetica", 16, "bold"), command=self.export, padx=30, pady=12).pack(side="left")
+
+        # Live mode: poll for committed changes and patch them into the view
+        self.live_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Live", variable=self.live_var, command=self.toggle_live,
+                       font=("Helvetica", 16), bg="#1e293b", fg="white", selectcolor="#0f172a",
+                       activebackground="#1e293b").pack(side="left", padx=20)
+        self.feed = None
+        self._live_after = None
+
+        self.status = tk.Label(control_frame, text="", font=("Helvetica", 14, "italic"), bg="#1e293b", fg="#00d4aa", width=12)
+        self.status.pack(side="left")
+
+        # All queries run on worker threads; results come back via root.after
+        self.executor = BackgroundExecutor(self.root, on_busy=self.set_busy,
+                                           on_error=lambda e: messagebox.showerror("Database Error", str(e)))
+
+        # Sorting (heading clicks) and filters are pushed down to SQLite
+        self.sort = None          # (column, descending)
+        self.filters = {}
+        self.filter_bar = FilterBar(self.root, self.apply_filters)
+
+        # Treeview (only the visible window of rows is ever loaded)
+        self.view = PagedTreeview(self.root, executor=self.executor, on_heading=self.sort_by)
+        self.tree = self.view.tree
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.show_photo(), add="+")
 
         # Footer
         footer = tk.Frame(self.root, bg="#1e293b")
         footer.pack(fill="x", pady=30)
+        # photo of the selected student, when the table has a photo column
+        self.thumbs = ThumbnailCache(self.executor)
+        self.photo_key = None
+        self.photo = tk.Label(footer, bg="#1e293b")
+        self.photo.pack()
         tk.Label(footer, text="students.db → Student records | users.db → Login credentials",
                  font=("Helvetica", 13), bg="#1e293b", fg="#94a3b8").pack()
+        tk.Label(footer, text="Click a heading to sort • Filters: text, >80, <=50, =S001, !=admin",
+                 font=("Helvetica", 12), bg="#1e293b", fg="#64748b").pack()
+
+        TraceOverlay.attach(self.root)
 
         # Initial load
         self.refresh()
 
-        self.root.mainloop()
-
-    def refresh(self):
         try:
-            db_name = self.db_var.get()
-            columns, rows, count = get_table_data(db_name)
+            self.root.mainloop()
+        finally:
+            self.executor.shutdown()
+            close_all()
+            TRACER.disable()
 
-            # Clear & setup columns
-            for col in self.tree["columns"]:
-                self.tree.delete(col)
-            self.tree["columns"] = columns
+    def set_busy(self, busy):
+        self.status.config(text="Loading…" if busy else "")
+        self.root.config(cursor="watch" if busy else "")
 
-            for col in columns:
-                self.tree.heading(col, text=col.title())
-                self.tree.column(col, width=160, anchor="center")
+    def refresh(self):
+        # keyed, so picking another database drops a load still in flight
+        self.executor.submit(self.open_table, self.db_var.get(), self.sort, self.filters,
+                             key="table", on_done=self.show_table)
 
-            # Clear old data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+    def switch_db(self):
+        self.sort = None
+        self.filters = {}
+        self.refresh()
 
-            # Insert new data
-            for row in rows:
-                self.tree.insert("", "end", values=row)
+    def sort_by(self, column):
+        descending = bool(self.sort and self.sort[0] == column and not self.sort[1])
+        self.sort = (column, descending)
+        self.refresh()
 
-            self.root.title(f"DB Viewer • {db_name} ({count} records)")
+    def apply_filters(self, filters):
+        self.filters = filters
+        self.refresh()
 
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
\ No newline at end of file
+    @staticmethod
+    def open_table(db_name, sort, filters):
+        # the feed's baseline is taken first, so nothing written during the load is missed
+        feed = ChangeFeed(db_name)
+        order_by, descending = sort or (None, False)
+        pager = sorted_pager(db_name, order_by, descending, filters)
+        pager.count()
+        return db_name, pager, feed
+
+    @traced("tk")
+    def show_table(self, result):
+        db_name, self.pager, self.feed = result
+        self.photo_key = None
+        self.photo.config(image="")
+        count = self.pager.count()
+        self.filter_bar.set_columns(self.pager.columns)
+        self.view.set_source(self.pager.columns, count, self.pager.fetch, sort=self.sort)
+
+        self.root.title(f"DB Viewer • {db_name} ({count} records)")
+
+    def show_photo(self):
+        selected = self.view.selected()
+        key = selected and selected[0]
+        if key == self.photo_key:
+            return                # re-selected after a scroll or redraw
+        self.photo_key = key
+        self.photo.config(image="")
+        if key is None or "photo" not in self.pager.columns:
+            return
+        column = self.pager.columns.index("photo")
+
+        def loaded(values):
+            if values and key == self.photo_key:
+                self.thumbs.request(values[column], lambda image: key == self.photo_key and self.photo.config(image=image))
+        # the row's real values; the treeview only holds their text
+        self.executor.submit(self.pager.get, key, busy=False, on_done=loaded)
+
+    # ---------- live mode ----------
+    def toggle_live(self):
+        if self.live_var.get():
+            self.schedule_live()
+        elif self._live_after:
+            self.root.after_cancel(self._live_after)
+            self._live_after = None
+
+    def schedule_live(self):
+        if self.live_var.get() and not self._live_after:
+            self._live_after = self.root.after(LIVE_POLL_MS, self.poll_live)
+
+    def poll_live(self):
+        self._live_after = None
+        if not self.live_var.get() or self.feed is None:
+            return
+
+        def failed(e):
+            self.live_var.set(False)
+            messagebox.showerror("Live mode stopped", str(e))
+        # one poll at a time: the next is scheduled when this one lands
+        self.executor.submit(self.read_changes, self.feed, self.pager, key="live", busy=False,
+                             on_done=self.apply_changes, on_error=failed)
+
+    @staticmethod
+    def read_changes(feed, pager):
+        changes = feed.poll()
+        if changes is None:
+            return None
+        count, rows, deleted = changes
+        if pager.where or pager.order_by or deleted:
+            # rows may have moved in or out of the sorted/filtered window: re-read it
+            pager.invalidate()
+            return pager, pager.count(), None, len(rows)
+        pager.note_insert(count - pager.count())
+        return pager, count, dict(rows), len(rows)
+
+    @traced("tk")
+    def apply_changes(self, result):
+        if result and result[0] is self.pager:
+            pager, total, changed, touched = result
+            if changed is None:
+                self.view.reload(total)
+            else:
+                self.view.update_rows(total, changed)
+            self.status.config(text=f"{touched} changed")
+            self.root.title(f"DB Viewer • {self.db_var.get()} ({total} records)")
+        self.schedule_live()
+
+    def export(self):
+        db_name = self.db_var.get()
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title=f"Export {db_name}", defaultextension=".csv",
+            initialfile=os.path.splitext(db_name)[0],
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Columnar", "*.col")])
+        if not path:
+            return
+
+        def progress(rows):
+            self.executor.call_soon(self.status.config, {"text": f"{rows} rows…"})
+        self.executor.submit(functools.partial(export_table, db_name, path, progress=progress),
+                             on_done=lambda rows: messagebox.showinfo("Export", f"Exported {rows} rows to\n{path}"))
\ No newline at end of file
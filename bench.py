@@ -0,0 +1,364 @@
+# db_viewer/bench.py
+"""Benchmarks for the data layer and the Tk render paths on synthetic databases.
+
+    python bench.py                                  # 1k / 10k / 100k rows
+    python bench.py --sizes 1000,1000000 --output after.json --compare before.json
+
+Startup is measured first: schema setup on a new and on a current
+database, importing the app, and (with a display) the time from process
+start to the first drawn login window, against STARTUP_TARGET_MS.
+Each size gets a fresh students.db / users.db in a temporary directory,
+filled through the roster importer. Results are written as JSON (timings
+in ms, plus the Python / SQLite / git versions) so runs can be compared;
+--compare flags benchmarks whose median got slower than --threshold.
+UI benchmarks need a display: $DISPLAY, or Xvfb if it is installed,
+otherwise they are recorded as skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    from .database import (init_databases, close_all, get_table_data, allocate_student_ids, login, add_user,
+                           get_student, read_cache, sorted_pager, student_pager, update_grades_many,
+                           DB_STUDENTS, SUBJECTS)
+    from .passwords import hash_password
+    from .importer import import_file
+    from .exporter import export_table
+    from .analytics import compute_summary
+except ImportError:
+    from database import (init_databases, close_all, get_table_data, allocate_student_ids, login, add_user,
+                          get_student, read_cache, sorted_pager, student_pager, update_grades_many,
+                          DB_STUDENTS, SUBJECTS)
+    from passwords import hash_password
+    from importer import import_file
+    from exporter import export_table
+    from analytics import compute_summary
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 5
+STARTUP_TARGET_MS = 500      # process start to a drawn login window
+FULL_READ_LIMIT = 100_000     # get_table_data holds every row in memory; skipped above this
+BENCH_USER, BENCH_PASSWORD = "bench", "bench-password"
+SYLLABLES = ["an", "be", "ca", "da", "el", "fi", "go", "ha", "is", "jo", "ka", "li", "mo", "ne", "or", "pa",
+             "ri", "sa", "te", "ul", "va", "yo", "za"]
+
+
+# ==================== SYNTHETIC DATA ====================
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+
+
+def write_roster(path, rows, seed=0):
+    """Writes a JSONL roster of rows synthetic students (about 5% of grades missing)"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(rows):
+            name, surname = _word(rng), _word(rng)
+            record = {"name": name, "surname": surname, "email": f"{name}.{surname}@school.test".lower()}
+            for subject in SUBJECTS:
+                if rng.random() > 0.05:
+                    record[subject] = round(min(100.0, max(0.0, rng.gauss(75, 15))), 1)
+            f.write(json.dumps(record) + "\n")
+
+
+def generate(directory, rows, seed=0):
+    """Fills directory/students.db and users.db with rows students; returns the import time in ms"""
+    roster = os.path.join(directory, "roster.jsonl")
+    write_roster(roster, rows, seed)
+    start = time.perf_counter()
+    import_file(roster, batch_size=5000)
+    elapsed = (time.perf_counter() - start) * 1000
+    add_user(BENCH_USER, hash_password(BENCH_PASSWORD), "admin")
+    return elapsed
+
+
+# ==================== TIMING ====================
+def timed(fn, repeat=REPEAT, setup=None):
+    """Milliseconds per call of fn() over repeat runs; setup() runs untimed before each"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def _stats(times):
+    return {"runs": len(times), "min_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3),
+            "max_ms": round(max(times), 3)}
+
+
+def _cold():
+    read_cache(DB_STUDENTS).close()
+
+
+# ==================== DATA LAYER ====================
+def data_benchmarks(rows, repeat):
+    pager = student_pager(["id", "name", "surname"] + SUBJECTS + ["average"])
+    last = max(0, rows - 50)
+    sample = [f"S{n:03d}" for n in random.Random(1).sample(range(1, rows + 1), min(rows, 200))]
+
+    def lookups():
+        for sid in sample:
+            get_student(sid)
+
+    def far_page():
+        p = sorted_pager(DB_STUDENTS, "math", True)
+        p.fetch(last, 50)
+
+    def export():
+        export_table(DB_STUDENTS, "export.csv")
+
+    def grade_sheet_save():
+        update_grades_many({sid: {"math": 50.0} for sid in sample})
+
+    benches = {
+        "allocate_student_ids x100": lambda: [allocate_student_ids() for _ in range(100)],
+        "login (KDF)": lambda: login(BENCH_USER, BENCH_PASSWORD),
+        "first page": (lambda: (pager.invalidate(), pager.count(), pager.fetch(0, 50)), _cold),
+        "last page, sorted": (far_page, _cold),
+        "search text": (lambda: student_pager(["id"], text="ka li").fetch(0, 50), _cold),
+        "search range": (lambda: student_pager(["id"], column="average", low=90).fetch(0, 50), _cold),
+        "get_student x200 cold": (lookups, _cold),
+        "get_student x200 cached": (lookups, None),
+        "class summary": (compute_summary, None),
+        "export csv": (export, None),
+        "update_grades_many x200": (grade_sheet_save, None),
+    }
+    if rows <= FULL_READ_LIMIT:
+        benches["get_table_data"] = (lambda: get_table_data(DB_STUDENTS), None)
+
+    results = {}
+    for name, bench in benches.items():
+        fn, setup = bench if isinstance(bench, tuple) else (bench, None)
+        lookups() if name.endswith("cached") else None        # warm the cache first
+        results[name] = _stats(timed(fn, repeat, setup))
+    return results
+
+
+# ==================== STARTUP ====================
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# run in a fresh interpreter; prints ms since the script started
+IMPORT_SCRIPT = """import time
+start = time.perf_counter()
+import studenttracker
+print((time.perf_counter() - start) * 1000)
+"""
+# the login window's mainloop is swapped for one drawn frame
+LOGIN_WINDOW_SCRIPT = """import time
+start = time.perf_counter()
+import studenttracker
+
+def first_frame(root, n=0):
+    root.update()
+    print((time.perf_counter() - start) * 1000)
+    root.destroy()
+studenttracker.tk.Tk.mainloop = first_frame
+studenttracker.init_databases()
+studenttracker.WelcomeApp()
+"""
+
+
+def _subprocess_ms(script, cwd):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [HERE, os.environ.get("PYTHONPATH")])))
+    out = subprocess.run([sys.executable, "-c", script], cwd=cwd, env=env, capture_output=True, text=True,
+                         timeout=120, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def startup_benchmarks(repeat, ui):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+        def fresh():
+            close_all()
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+
+        os.chdir(directory)
+        try:
+            results = {"init_databases, new": _stats(timed(init_databases, repeat, fresh)),
+                       "init_databases, current": _stats(timed(init_databases, repeat)),
+                       "import studenttracker": _stats([_subprocess_ms(IMPORT_SCRIPT, directory)
+                                                        for _ in range(repeat)])}
+        finally:
+            close_all()
+            os.chdir(cwd)
+        if ui:
+            window = _stats([_subprocess_ms(LOGIN_WINDOW_SCRIPT, directory) for _ in range(repeat)])
+            window.update(target_ms=STARTUP_TARGET_MS, met=window["median_ms"] <= STARTUP_TARGET_MS)
+            results["login window"] = window
+    return results
+
+
+# ==================== UI ====================
+def _start_display():
+    """Returns (display process or None, reason skipped or None)"""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None, None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None, "no $DISPLAY and Xvfb is not installed"
+    display = ":97"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1600x1200x24"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return proc, None
+
+
+def ui_benchmarks(rows, repeat):
+    import tkinter as tk
+    from types import SimpleNamespace
+    try:
+        from .widgets import PagedTreeview, VirtualCardList
+        from .executor import BackgroundExecutor
+        from .photos import ThumbnailCache
+        from .studenttracker import StudentManagerApp, CARD_COLUMNS
+    except ImportError:
+        from widgets import PagedTreeview, VirtualCardList
+        from executor import BackgroundExecutor
+        from photos import ThumbnailCache
+        from studenttracker import StudentManagerApp, CARD_COLUMNS
+
+    root = tk.Tk()
+    root.geometry("1300x900")
+    executor = BackgroundExecutor(root)
+    app = SimpleNamespace(thumbs=ThumbnailCache(executor))      # what the card callbacks use of the app
+    try:
+        view = PagedTreeview(root)
+        cards = VirtualCardList(root, lambda parent: StudentManagerApp.build_student_card(app, parent),
+                                lambda card, key, row: StudentManagerApp.fill_student_card(app, card, key, row))
+        root.update()
+
+        def viewer_refresh():            # what DBViewerApp.open_table + show_table do, synchronously
+            pager = sorted_pager(DB_STUDENTS)
+            view.set_source(pager.columns, pager.count(), pager.fetch)
+            root.update()
+
+        def viewer_scroll():
+            for top in range(0, min(rows, 20_000), max(1, min(rows, 20_000) // 50)):
+                view.scroll_to(top)
+                root.update_idletasks()
+
+        def show_all_students():
+            pager = student_pager(CARD_COLUMNS)
+            cards.set_source(pager.count(), pager.fetch)
+            root.update()
+
+        return {"DBViewerApp.refresh": _stats(timed(viewer_refresh, repeat, _cold)),
+                "treeview scroll x50": _stats(timed(viewer_scroll, repeat)),
+                "show_all_students": _stats(timed(show_all_students, repeat, _cold))}
+    finally:
+        executor.shutdown()
+        root.destroy()
+
+
+# ==================== RUN ====================
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(sizes=SIZES, repeat=REPEAT, ui=True, progress=print):
+    results = {"created": datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+               "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+               "platform": platform.platform(), "cpus": os.cpu_count(), "sizes": {}}
+    display, skip_ui = _start_display() if ui else (None, "disabled with --no-ui")
+    cwd = os.getcwd()
+    try:
+        progress("startup…")
+        results["startup"] = startup_benchmarks(repeat, not skip_ui)
+        for rows in sizes:
+            with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+                os.chdir(directory)          # the data layer works on students.db / users.db in the cwd
+                try:
+                    init_databases()
+                    progress(f"{rows} rows: generating…")
+                    entry = {"import": _stats([generate(directory, rows)])}
+                    progress(f"{rows} rows: data layer…")
+                    entry.update(data_benchmarks(rows, repeat))
+                    if skip_ui:
+                        entry["ui"] = {"skipped": skip_ui}
+                    else:
+                        progress(f"{rows} rows: UI…")
+                        entry["ui"] = ui_benchmarks(rows, repeat)
+                    results["sizes"][str(rows)] = entry
+                finally:
+                    close_all()
+                    os.chdir(cwd)
+    finally:
+        if display:
+            display.terminate()
+    return results
+
+
+def compare(old, new, threshold=0.2):
+    """[(size, benchmark, old median, new median)] for medians slower by more than threshold"""
+    slower = []
+    groups = list(new["sizes"].items()) + [("startup", new.get("startup", {}))]
+    for size, benches in groups:
+        before = old.get("startup", {}) if size == "startup" else old.get("sizes", {}).get(size, {})
+        flat = dict(benches, **{f"ui: {k}": v for k, v in benches.get("ui", {}).items() if isinstance(v, dict)})
+        flat_before = dict(before, **{f"ui: {k}": v for k, v in before.get("ui", {}).items() if isinstance(v, dict)})
+        for name, stats in flat.items():
+            if name == "ui" or name not in flat_before or "median_ms" not in stats:
+                continue
+            a, b = flat_before[name]["median_ms"], stats["median_ms"]
+            if a and b > a * (1 + threshold):
+                slower.append((size, name, a, b))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data layer and UI on synthetic databases")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--no-ui", action="store_true", help="skip the Tk benchmarks")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run(sizes, args.repeat, ui=not args.no_ui, progress=lambda m: print(m, file=sys.stderr))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print("\nstartup")
+    for name, stats in results["startup"].items():
+        met = "" if "met" not in stats else f"  (target {stats['target_ms']} ms: {'met' if stats['met'] else 'MISSED'})"
+        print(f"  {name:<28} {stats['median_ms']:>10.2f} ms{met}")
+    for size, benches in results["sizes"].items():
+        print(f"\n{size} rows")
+        for name, stats in benches.items():
+            for label, s in (stats.items() if name == "ui" else [(name, stats)]):
+                print(f"  {label:<28} {s['median_ms']:>10.2f} ms" if "median_ms" in s else f"  {label:<28} {s}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            slower = compare(json.load(f), results, args.threshold)
+        print(f"\n{len(slower)} regressions vs {args.compare}")
+        for size, name, a, b in slower:
+            print(f"  {size} rows  {name}: {a:.2f} -> {b:.2f} ms")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,796 @@
 # db_viewer/database.py
 import sqlite3
 import os
+import re
+import threading
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    from .passwords import hash_password, verify_password
+    from .tracing import connection_factory
+except ImportError:
+    from passwords import hash_password, verify_password
+    from tracing import connection_factory
 
 DB_STUDENTS = "students.db"
 DB_USERS = "users.db"
+TABLES = {DB_STUDENTS: "students", DB_USERS: "users"}
 
-def get_table_data(db_name):
-    """Returns columns and rows from the selected database"""
+# ==================== CONNECTION POOL ====================
+PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+SCHEMA_PRAGMAS = (                   # applied to main and to every attached file
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "cache_size=-16000",             # 16 MB page cache per connection
+    "mmap_size=268435456",           # 256 MB memory-mapped I/O
+)
+STATEMENT_CACHE = 256
+BUSY_TIMEOUT = 5.0
+POOL_SIZE = 4
+
+
+class ConnectionPool:
+    """Keeps long-lived, tuned connections to one database file, with
+    attach=((alias, path), ...) attached to each connection"""
+
+    def __init__(self, path, size=None, attach=()):
+        self.path = path
+        self.size = size or POOL_SIZE
+        self.attach = attach
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE, factory=connection_factory())
+        for alias, path in self.attach:
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        for schema in ["main"] + [alias for alias, _ in self.attach]:
+            for pragma in SCHEMA_PRAGMAS:
+                conn.execute(f"PRAGMA {schema}.{pragma}")
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_name, attach=()):
+    """Returns the shared pool for a database file (plus attached files),
+    creating it on first use"""
+    path = os.path.abspath(db_name)
+    attach = tuple((alias, os.path.abspath(name)) for alias, name in attach)
+    with _pools_lock:
+        pool = _pools.get((path, attach))
+        if pool is None:
+            pool = _pools[path, attach] = ConnectionPool(path, attach=attach)
+        return pool
+
+
+def set_pool_size(size):
+    """Idle connections kept per database, e.g. one per server thread"""
+    global POOL_SIZE
+    POOL_SIZE = size
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.size = size
+
+
+@contextmanager
+def connection(db_name, attach=()):
+    """Checks out a pooled connection; commits on success, rolls back on error"""
+    pool = get_pool(db_name, attach)
+    conn = pool.acquire()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.release(conn)
+
+
+# users.db attached to students.db, for writes and reads that span both
+AUTH = "auth"
+ACCOUNTS = ((AUTH, DB_USERS),)
+
+
+def accounts():
+    """connection() to students.db with users.db attached as "auth", so a
+    student row and its login are written in one transaction.
+
+    In WAL mode SQLite commits each attached file atomically but not the
+    pair as a unit: the files commit back to back inside the one COMMIT."""
+    return connection(DB_STUDENTS, attach=ACCOUNTS)
+
+
+def close_all():
+    """Closes every pooled connection (call on shutdown)"""
+    with _pools_lock:
+        pools = list(_pools.values()) + list(_caches.values())
+        _pools.clear()
+        _caches.clear()
+    for pool in pools:
+        pool.close()
+
+
+# ==================== READ CACHE ====================
+READ_CACHE_ROWS = 20_000   # rows kept per database file; a cached page counts all of its rows
+
+
+class ReadCache:
+    """LRU of query results for one database file, bounded by the number of
+    rows held rather than entries, since one entry may be a whole page.
+
+    All entries are dropped once the file changes. A dedicated connection's
+    PRAGMA data_version moves whenever any other connection commits, in this
+    process or another; the write generation moves on every notify(). Checking
+    both costs a few microseconds and no disk I/O.
+    """
+
+    def __init__(self, path, max_rows=READ_CACHE_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.hits = self.misses = self.evictions = 0
+        self.rows = 0
+        self._entries = OrderedDict()    # key -> (value, rows)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._token = None
+
+    def _version(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        return self._conn.execute("PRAGMA data_version").fetchone()[0], _write_generation
+
+    def _clear(self):
+        self._entries.clear()
+        self.rows = 0
+
+    def get(self, key, load, rows=None):
+        """Cached result for key, or load() on a miss; results are shared, don't mutate them.
+        rows(value) is how many rows a result holds (default 1); one larger than
+        the whole cache is returned without being kept."""
+        with self._lock:
+            token = self._version()
+            if token != self._token:
+                self._clear()
+                self._token = token
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = load()
+        size = rows(value) if rows else 1
+        with self._lock:
+            # a commit during load() may or may not be in value: don't keep it
+            if self._version() == token == self._token and size <= self.max_rows and key not in self._entries:
+                self._entries[key] = (value, size)
+                self.rows += size
+                while self.rows > self.max_rows:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.rows -= evicted
+                    self.evictions += 1
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._entries), "rows": self.rows}
+
+    def close(self):
+        with self._lock:
+            self._clear()
+            self._token = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_caches = {}
+
+
+def read_cache(db_name):
+    """Returns the shared ReadCache for a database file"""
+    path = os.path.abspath(db_name)
+    with _pools_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ReadCache(path)
+        return cache
+
+
+class ChangeFeed:
+    """Polls one database for rows written since the previous poll.
+
+    PRAGMA data_version on a dedicated connection says whether anything was
+    committed at all; only then are the rows with a newer change_seq read."""
+
+    def __init__(self, db_name):
+        if not os.path.exists(db_name):
+            raise FileNotFoundError(f"Database {db_name} not found!")
+        self.db_name = db_name
+        self.table = TABLES[db_name]
+        self._conn = sqlite3.connect(os.path.abspath(db_name), check_same_thread=False)
+        self._version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        with connection(db_name) as conn:
+            self.seq, self.deleted = self._counters(conn)
+
+    def _counters(self, conn):
+        return conn.execute("SELECT value, deleted FROM change_sequence WHERE name=?", (self.table,)).fetchone()
+
+    def poll(self):
+        """None if nothing was committed, else (row count, [(rowid, values), ...], rows deleted)
+        with values as in SELECT *, for the rows inserted or updated since"""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return None
+        self._version = version
+        with connection(self.db_name) as conn:
+            conn.execute("BEGIN")          # counters, rows and count from one snapshot
+            seq, deleted = self._counters(conn)
+            rows = conn.execute(f"SELECT rowid, * FROM {self.table} WHERE change_seq > ? ORDER BY change_seq",
+                                (self.seq,)).fetchall()
+            count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        gone, self.seq, self.deleted = deleted - self.deleted, seq, deleted
+        return count, [(row[0], row[1:]) for row in rows], gone
+
+
+def cache_stats():
+    """{database path: hit/miss/eviction counters} for every read cache"""
+    with _pools_lock:
+        caches = list(_caches.values())
+    return {cache.path: cache.stats() for cache in caches}
+
+
+# ==================== SCHEMA ====================
+SCHEMA_VERSION = 3        # stored in PRAGMA user_version; bump with every schema change below
+
+
+def _schema_current(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+
+
+def _begin_upgrade(conn):
+    """Opens the write transaction an upgrade runs in, so a failed upgrade
+    leaves the file as it was (sqlite3 would otherwise commit every ALTER
+    on its own); False when the schema is already current"""
+    if _schema_current(conn):
+        return False
+    conn.execute("BEGIN IMMEDIATE")
+    return not _schema_current(conn)     # another process may have just upgraded it
+
+
+def _require_columns(conn, table, columns):
+    missing = [col for col in columns if col not in table_columns(conn, table)]
+    if missing:
+        path = conn.execute("PRAGMA database_list").fetchone()[2]
+        raise sqlite3.DatabaseError(f"{os.path.basename(path)} has a {table} table this version can't upgrade "
+                                    f"(missing {', '.join(missing)}); move the file aside to start a new one")
+
+
+def init_databases():
+    """Creates or upgrades both schemas and seeds the admin login, one
+    transaction per file. Once a database's user_version says it is
+    current, it is not touched again. Raises sqlite3.DatabaseError for a
+    table whose layout can't be upgraded."""
+    with connection(DB_USERS) as conn:
+        if _begin_upgrade(conn):
+            conn.execute('''CREATE TABLE IF NOT EXISTS users (
+                            username TEXT PRIMARY KEY, password TEXT NOT NULL, role TEXT NOT NULL)''')
+            _require_columns(conn, "users", ["username", "password", "role"])
+            init_change_tracking(conn, "users")
+            if not conn.execute("SELECT 1 FROM users WHERE username='admin'").fetchone():
+                conn.execute("INSERT INTO users (username, password, role) VALUES ('admin', ?, 'admin')",
+                             (hash_password('admin'),))
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    with connection(DB_STUDENTS) as conn:
+        if _begin_upgrade(conn):
+            conn.execute('''CREATE TABLE IF NOT EXISTS students (
+                            id TEXT PRIMARY KEY,
+                            name TEXT NOT NULL,
+                            surname TEXT NOT NULL,
+                            email TEXT,
+                            english REAL, history REAL, math REAL, science REAL, art REAL,
+                            added_date TEXT, photo TEXT)''')
+            _require_columns(conn, "students", ["id", "name", "surname", "email", *SUBJECTS, "added_date"])
+            if "photo" not in table_columns(conn, "students"):
+                conn.execute("ALTER TABLE students ADD COLUMN photo TEXT")     # path to the student's photo
+            conn.execute("CREATE TABLE IF NOT EXISTS id_sequence (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            if not conn.execute("SELECT 1 FROM id_sequence WHERE name='students'").fetchone():
+                # one-time seed from the numeric part of existing "S###" ids
+                conn.execute("""INSERT INTO id_sequence
+                                SELECT 'students', COALESCE(MAX(CAST(SUBSTR(id, 2) AS INTEGER)), 0)
+                                FROM students WHERE id GLOB 'S[0-9]*'""")
+            init_search(conn)
+            init_change_tracking(conn, "students")
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+def init_change_tracking(conn, table):
+    """Adds change_seq, stamped by triggers with a table-wide increasing number
+    on every insert and update, so readers can ask for "rows changed since N".
+    Deletes are counted too, since a deleted row leaves nothing to stamp.
+
+    The numbers come from a counter row in change_sequence that only ever
+    grows, not from MAX(change_seq), which goes back down when the newest
+    row is deleted. Writes are serialized, so numbers grow in commit order
+    and a poller can never skip one."""
+    if "change_seq" not in table_columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN change_seq INTEGER")
+        conn.execute(f"UPDATE {table} SET change_seq = rowid")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table}(change_seq)")
+    conn.execute("""CREATE TABLE IF NOT EXISTS change_sequence (
+                        name TEXT PRIMARY KEY, value INTEGER NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)""")
+    conn.execute(f"INSERT OR IGNORE INTO change_sequence (name, value) SELECT ?, COALESCE(MAX(change_seq), 0) FROM {table}",
+                 (table,))
+    data = ", ".join(row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] != "change_seq")
+    stamp = (f"UPDATE change_sequence SET value = value + 1 WHERE name = '{table}'; "
+             f"UPDATE {table} SET change_seq = (SELECT value FROM change_sequence WHERE name = '{table}') "
+             "WHERE rowid = new.rowid;")
+    # recreated on every schema upgrade so the column list follows the table
+    for trigger in ("ai", "au", "ad"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {table}_seq_{trigger}")
+    conn.execute(f"CREATE TRIGGER {table}_seq_ai AFTER INSERT ON {table} BEGIN {stamp} END")
+    conn.execute(f"CREATE TRIGGER {table}_seq_au AFTER UPDATE OF {data} ON {table} BEGIN {stamp} END")
+    conn.execute(f"""CREATE TRIGGER {table}_seq_ad AFTER DELETE ON {table} BEGIN
+                         UPDATE change_sequence SET deleted = deleted + 1 WHERE name = '{table}';
+                     END""")
+
+
+# average over the grades that are present: NULL is missing, 0 is a real grade
+AVERAGE_SQL = """(COALESCE(english, 0) + COALESCE(history, 0) + COALESCE(math, 0)
+                 + COALESCE(science, 0) + COALESCE(art, 0)) * 1.0
+                / NULLIF((english IS NOT NULL) + (history IS NOT NULL) + (math IS NOT NULL)
+                         + (science IS NOT NULL) + (art IS NOT NULL), 0)"""
+
+FTS_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN
+           INSERT INTO students_fts(rowid, id, name, surname, email)
+           VALUES (new.rowid, new.id, new.name, new.surname, new.email);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN
+           INSERT INTO students_fts(students_fts, rowid, id, name, surname, email)
+           VALUES ('delete', old.rowid, old.id, old.name, old.surname, old.email);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF id, name, surname, email ON students BEGIN
+           INSERT INTO students_fts(students_fts, rowid, id, name, surname, email)
+           VALUES ('delete', old.rowid, old.id, old.name, old.surname, old.email);
+           INSERT INTO students_fts(rowid, id, name, surname, email)
+           VALUES (new.rowid, new.id, new.name, new.surname, new.email);
+       END""",
+)
+
+
+def init_search(conn):
+    """Computed average column, grade indexes and the FTS5 index over id/name/surname/email"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(students)")}
+    if "average" not in columns:
+        conn.execute(f"ALTER TABLE students ADD COLUMN average REAL GENERATED ALWAYS AS ({AVERAGE_SQL}) VIRTUAL")
+    for col in SUBJECTS + ["average"]:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_students_{col} ON students({col})")
+
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name='students_fts'").fetchone():
+        conn.execute("""CREATE VIRTUAL TABLE students_fts USING fts5(
+                            id, name, surname, email, content='students', content_rowid='rowid',
+                            tokenize='unicode61 remove_diacritics 2', prefix='2 3')""")
+        conn.execute("INSERT INTO students_fts(students_fts) VALUES ('rebuild')")
+    for trigger in FTS_TRIGGERS:
+        conn.execute(trigger)
+
+
+# ==================== ID ALLOCATION ====================
+def format_student_id(n):
+    return f"S{n:03d}"
+
+
+def allocate_student_ids(count=1):
+    """Atomically reserves count consecutive student IDs from the sequence table.
+
+    One UPDATE ... RETURNING, so concurrent writers (threads or processes)
+    never get the same number and no table scan is needed."""
+    with connection(DB_STUDENTS) as conn:
+        return reserve_student_ids(conn, count)
+
+
+def reserve_student_ids(conn, count=1):
+    """allocate_student_ids() inside the caller's transaction"""
+    (last,) = conn.execute("UPDATE id_sequence SET value = value + ? WHERE name='students' RETURNING value",
+                           (count,)).fetchall()[0]
+    return [format_student_id(n) for n in range(last - count + 1, last + 1)]
+
+
+def bump_student_sequence(n, conn=None):
+    """Moves the sequence past n, e.g. after importing explicit "S###" ids.
+    Pass conn to do it inside a transaction the caller already has open."""
+    if conn is None:
+        with connection(DB_STUDENTS) as conn:
+            return bump_student_sequence(n, conn)
+    conn.execute("UPDATE id_sequence SET value = MAX(value, ?) WHERE name='students'", (n,))
+
+
+# ==================== CHANGE EVENTS ====================
+_listeners = []
+_listeners_lock = threading.Lock()
+_write_generation = 0
+
+
+def subscribe(listener):
+    """Registers listener(event, table, key), called after every committed write"""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def notify(event, table, key):
+    """Tells listeners that a row was inserted or updated ("insert"/"update")"""
+    global _write_generation
+    with _listeners_lock:
+        _write_generation += 1
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(event, table, key)
+
+
+# ==================== WRITES ====================
+SUBJECTS = ["english", "history", "math", "science", "art"]
+
+
+def update_grades(student_id, grades):
+    with connection(DB_STUDENTS) as conn:
+        conn.execute("UPDATE students SET english=?, history=?, math=?, science=?, art=? WHERE id=?",
+                     (*grades, student_id))
+    notify("update", "students", student_id)
+
+
+GRADE_CELLS = ", ".join(f"{s} = CASE WHEN ? THEN ? ELSE {s} END" for s in SUBJECTS)
+
+
+def update_grades_many(changes):
+    """Writes edited cells, {student_id: {subject: grade}}, with one executemany
+    in one transaction; subjects missing from a student's dict keep their value.
+    Returns the number of students updated."""
+    rows = []
+    for student_id, cells in changes.items():
+        params = []
+        for subject in SUBJECTS:
+            params += [subject in cells, cells.get(subject)]
+        rows.append((*params, student_id))
+    with connection(DB_STUDENTS) as conn:
+        updated = conn.executemany(f"UPDATE students SET {GRADE_CELLS} WHERE id=?", rows).rowcount
+    for student_id in changes:
+        notify("update", "students", student_id)
+    return updated
+
+
+def add_user(username, password_hash, role):
+    with connection(DB_USERS) as conn:
+        conn.execute("INSERT INTO users (username, password, role) VALUES (?,?,?)", (username, password_hash, role))
+    notify("insert", "users", username)
+
+
+def add_student_account(student_id, name, surname, email, grades, added_date, password_hash):
+    """Inserts a student and their login in a single transaction over the
+    attached databases; student_id None takes the next one from the sequence.
+    Returns the student id."""
+    with accounts() as conn:
+        if student_id is None:
+            student_id = reserve_student_ids(conn)[0]
+        conn.execute('''INSERT INTO students
+            (id, name, surname, email, english, history, math, science, art, added_date)
+            VALUES (?,?,?,?,?,?,?,?,?,?)''',
+            (student_id, name, surname, email, *grades, added_date))
+        conn.execute(f"INSERT INTO {AUTH}.users (username, password, role) VALUES (?,?,'student')", (student_id, password_hash))
+    notify("insert", "students", student_id)
+    notify("insert", "users", student_id)
+    return student_id
+
+
+# ==================== QUERIES ====================
+EXPORT_CHUNK = 1000
+
+
+@contextmanager
+def table_reader(db_name, chunk_size=EXPORT_CHUNK):
+    """Streams the selected database's table: yields (columns, chunks), where
+    chunks iterates lists of at most chunk_size rows from one cursor"""
     if not os.path.exists(db_name):
         raise FileNotFoundError(f"Database {db_name} not found!")
 
-    conn = sqlite3.connect(db_name)
-    cur = conn.cursor()
+    with connection(db_name) as conn:
+        cur = conn.execute(f"SELECT * FROM {TABLES.get(db_name, 'users')}")
+        columns = [desc[0] for desc in cur.description]
+        yield columns, iter(lambda: cur.fetchmany(chunk_size), [])
+
+
+def get_table_data(db_name):
+    """Returns columns and rows from the selected database"""
+    with table_reader(db_name) as (columns, chunks):
+        rows = [row for chunk in chunks for row in chunk]
+
+    return columns, rows, len(rows)
+
+
+def get_student(student_id):
+    """(name, surname, english, history, math, science, art) or None"""
+    def load():
+        with connection(DB_STUDENTS) as conn:
+            return conn.execute("SELECT name, surname, english, history, math, science, art FROM students WHERE id=?",
+                                (student_id,)).fetchone()
+    return read_cache(DB_STUDENTS).get(("student", student_id), load)
+
+
+_dummy_hash = None
+
+
+def login(username, password):
+    """(role, profile) for a matching account, or None for a wrong ID/password.
+
+    profile is the get_student() row, fetched in the same joined query as
+    the login, or None if the account has no student record. Runs the
+    (deliberately slow) KDF, so call it off the UI thread. Legacy or outdated
+    hashes are re-hashed with the current parameters on success.
+    """
+    global _dummy_hash
+    with accounts() as conn:
+        row = conn.execute(f'''SELECT u.password, u.role, s.name, s.surname,
+                                      s.english, s.history, s.math, s.science, s.art
+                               FROM {AUTH}.users u LEFT JOIN students s ON s.id = u.username
+                               WHERE u.username=?''', (username,)).fetchone()
+    if row is None:
+        # same work as a real check, so unknown IDs can't be told apart by timing
+        _dummy_hash = _dummy_hash or hash_password("")
+        verify_password(password, _dummy_hash)
+        return None
+
+    stored, role, *profile = row
+    ok, needs_rehash = verify_password(password, stored)
+    if not ok:
+        return None
+    if needs_rehash:
+        with connection(DB_USERS) as conn:
+            conn.execute("UPDATE users SET password=? WHERE username=? AND password=?",
+                         (hash_password(password), username, stored))
+    return role, (tuple(profile) if profile[0] is not None else None)
+
+
+# ==================== SORT & FILTER ====================
+FILTER_OPS = ("<=", ">=", "!=", "<", ">", "=")
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_xinfo({quote(table)})")]
+
+
+def column_filter(column, text):
+    """Filter box text -> (condition, params): ">80", "<=50", "=S001", "!=x" compare,
+    anything else is a case-insensitive substring match"""
+    text = text.strip()
+    col = quote(column)
+    for op in FILTER_OPS:
+        if text.startswith(op):
+            # bound as text; the column's affinity turns it into a number where that applies
+            return f"{col} {op} ?", [text[len(op):].strip()]
+    return f"{col} LIKE ? ESCAPE '\\'", ["%" + re.sub(r"([%_\\])", r"\\\1", text) + "%"]
+
+
+def ensure_index(db_name, table, column):
+    """Creates an index on a column the user sorts or filters by, unless one already leads with it"""
+    with connection(db_name) as conn:
+        if column not in table_columns(conn, table):
+            raise ValueError(f"{table} has no column {column!r}")
+        for index in conn.execute(f"PRAGMA index_list({quote(table)})").fetchall():
+            first = conn.execute(f"PRAGMA index_info({quote(index[1])})").fetchone()
+            if first and first[2] == column:
+                return
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(f'idx_{table}_{column}')} ON {quote(table)}({quote(column)})")
+
+
+def sorted_pager(db_name, order_by=None, descending=False, filters=None):
+    """TablePager over the selected database's table, sorted and filtered in SQL.
+
+    filters maps column -> filter box text (see column_filter). Sorted and
+    compared columns get an index on demand so large tables stay cheap."""
+    table = TABLES[db_name]
+    where, params = [], []
+    for column, text in (filters or {}).items():
+        if text.strip():
+            cond, values = column_filter(column, text)
+            where.append(cond)
+            params += values
+            if text.strip().startswith(FILTER_OPS):      # substring matches can't use an index
+                ensure_index(db_name, table, column)
+    if order_by:
+        ensure_index(db_name, table, order_by)
+    return TablePager(db_name, table, where=" AND ".join(where) or None, params=params,
+                      order_by=order_by, descending=descending)
+
+
+# ==================== SEARCH ====================
+FILTER_COLUMNS = SUBJECTS + ["average"]
+
+
+def fts_query(text):
+    """Search box text -> FTS5 query: every word must match as a prefix"""
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+def student_pager(columns, key="id", text="", column=None, low=None, high=None):
+    """TablePager over the students matching search text and an optional
+    [low, high] range on one subject or the average"""
+    where, params = [], []
+    query = fts_query(text)
+    if query:
+        where.append("rowid IN (SELECT rowid FROM students_fts WHERE students_fts MATCH ?)")
+        params.append(query)
+    if column:
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter on {column!r}")
+        if low is not None:
+            where.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            where.append(f"{column} <= ?")
+            params.append(high)
+    return TablePager(DB_STUDENTS, "students", columns, key=key, where=" AND ".join(where) or None, params=params)
+
+
+# ==================== PAGING ====================
+ANCHOR_EVERY = 100     # remember the sort key of every Nth row for keyset jumps
+MAX_SKIP = 2000        # farther than this from an anchor, seek the key with an index-only query
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class TablePager:
+    """Fetches windows of a table by keyset pagination on (order_by, rowid),
+    optionally restricted by a WHERE clause (where + params)"""
+
+    def __init__(self, db_name, table=None, columns="*", key=None, where=None, params=(),
+                 order_by=None, descending=False):
+        if not os.path.exists(db_name):
+            raise FileNotFoundError(f"Database {db_name} not found!")
+        self.db_name = db_name
+        self.table = table or TABLES[db_name]
+        self.select = columns if isinstance(columns, str) else ", ".join(columns)
+        with connection(db_name) as conn:
+            cur = conn.execute(f"SELECT {self.select} FROM {self.table} LIMIT 0")
+            self.columns = [desc[0] for desc in cur.description]
+            if order_by and order_by not in table_columns(conn, self.table):
+                raise ValueError(f"Cannot sort {self.table} by {order_by!r}")
+        self.key = key                  # column returned as the row key (default: rowid)
+        self._key_index = self.columns.index(key) if key else None
+        self.where = where
+        self.params = tuple(params)
+        self.order_by = order_by
+        self.descending = descending
+        self._sort = quote(order_by) if order_by else "rowid"
+        direction = " DESC" if descending else ""
+        self._order = f"{self._sort}{direction}, rowid{direction}" if order_by else f"rowid{direction}"
+        self._query = (self.table, self.select, where, self.params)     # read cache key
+        self._count = None
+        self._anchors = {}    # offset -> (sort value, rowid) of the row at that offset
+        self._anchor_offsets = []
+        self._lock = threading.Lock()   # fetch() may run on several worker threads
+
+    def count(self):
+        """Total rows, cached until invalidate()"""
+        if self._count is None:
+            def load():
+                with connection(self.db_name) as conn:
+                    return conn.execute(f"SELECT COUNT(*) FROM {self.table} {self._filter()}",
+                                        self.params).fetchone()[0]
+            self._count = read_cache(self.db_name).get(("count", self._query), load)
+        return self._count
+
+    def invalidate(self):
+        with self._lock:
+            self._count = None
+            self._anchors.clear()
+            self._anchor_offsets.clear()
+
+    def _filter(self, *conditions):
+        conditions = ([f"({self.where})"] if self.where else []) + list(conditions)
+        return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+    def _from_key(self, value, rowid):
+        """Condition + params selecting rows at or after (value, rowid) in sort order"""
+        le, lt = ("<=", "<") if self.descending else (">=", ">")
+        if not self.order_by:
+            return f"rowid {le} ?", (rowid,)
+        col = self._sort
+        # SQLite sorts NULLs first ascending and last descending
+        if value is None and self.descending:
+            return f"({col} IS NULL AND rowid <= ?)", (rowid,)
+        if value is None:
+            return f"(({col} IS NULL AND rowid >= ?) OR {col} IS NOT NULL)", (rowid,)
+        tail = f" OR {col} IS NULL" if self.descending else ""
+        return f"({col} {lt} ? OR ({col} = ? AND rowid {le} ?){tail})", (value, value, rowid)
+
+    def fetch(self, offset, limit):
+        """Returns [(key, values), ...] for rows offset .. offset+limit in sort order"""
+        rows = read_cache(self.db_name).get(("page", self._query, self._order, offset, limit),
+                                            lambda: self._read(offset, limit), rows=len)
+        with self._lock:
+            for i, row in enumerate(rows):
+                if (i == 0 or (offset + i) % ANCHOR_EVERY == 0) and offset + i not in self._anchors:
+                    self._anchors[offset + i] = (row[1], row[0])
+                    insort(self._anchor_offsets, offset + i)
+        if self._key_index is None:
+            return [(row[0], row[2:]) for row in rows]
+        return [(row[2 + self._key_index], row[2:]) for row in rows]
+
+    def _read(self, offset, limit):
+        base = f"SELECT rowid, {self._sort}, {self.select} FROM {self.table}"
+        with self._lock:
+            i = bisect_right(self._anchor_offsets, offset)
+            anchor = self._anchor_offsets[i - 1] if i else None
+            anchor_key = self._anchors.get(anchor)
+
+        with connection(self.db_name) as conn:
+            if anchor is None or offset - anchor > MAX_SKIP:
+                if offset <= MAX_SKIP:
+                    anchor, anchor_key = 0, None
+                else:
+                    # find the key at offset by walking the (index) order only, then keyset from it
+                    anchor_key = conn.execute(
+                        f"SELECT {self._sort}, rowid FROM {self.table} {self._filter()} "
+                        f"ORDER BY {self._order} LIMIT 1 OFFSET ?", self.params + (offset,)).fetchone()
+                    anchor = offset
+            if anchor_key is None:
+                sql = f"{base} {self._filter()} ORDER BY {self._order} LIMIT ? OFFSET ?"
+                params = self.params + (limit, offset)
+            else:
+                cond, key_params = self._from_key(*anchor_key)
+                sql = f"{base} {self._filter(cond)} ORDER BY {self._order} LIMIT ? OFFSET ?"
+                params = self.params + key_params + (limit, offset - anchor)
+            return tuple(conn.execute(sql, params).fetchall())
 
-    if db_name == DB_STUDENTS:
-        cur.execute("SELECT * FROM students")
-    else:  # users.db
-        cur.execute("SELECT * FROM users")
+    def get(self, key):
+        """Values of the single row with this key, or None"""
+        where = f"{self.key}=?" if self.key else "rowid=?"
 
-    rows = cur.fetchall()
-    columns = [desc[0] for desc in cur.description]
-    conn.close()
+        def load():
+            with connection(self.db_name) as conn:
+                return conn.execute(f"SELECT {self.select} FROM {self.table} WHERE {where}", (key,)).fetchone()
+        return read_cache(self.db_name).get(("row", self.table, self.select, where, key), load)
 
-    return columns, rows, len(rows)
\ No newline at end of file
+    def note_insert(self, count=1):
+        """Keeps the cached count in step with rows appended by this process"""
+        if self._count is not None:
+            self._count += count
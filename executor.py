@@ -0,0 +1,128 @@
+# db_viewer/executor.py
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 20
+
+
+class Task:
+    """Handle for submitted work; a cancelled task never calls back"""
+
+    def __init__(self, key, busy=True):
+        self.key = key
+        self.busy = busy
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class BackgroundExecutor:
+    """Runs blocking work (SQL, hashing) on worker threads and hands results
+    back to the Tk thread, which polls a queue with root.after.
+
+    Submitting with a key supersedes the previous task with the same key, so
+    stale loads (e.g. a database switched mid-load) are dropped.
+    """
+
+    def __init__(self, root, workers=4, on_busy=None, on_error=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-worker")
+        self._results = queue.Queue()
+        self._latest = {}       # key -> newest Task
+        self._pending = 0
+        self._closed = False
+        self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, busy=True):
+        """Runs fn(*args) off the UI thread; on_done(result) / on_error(exc) run on it.
+        busy=False keeps background polling out of the on_busy indicator."""
+        task = Task(key, busy)
+        if key is not None:
+            old = self._latest.get(key)
+            if old:
+                old.cancel()
+            self._latest[key] = task
+        if busy:
+            self._pending += 1
+            if self._pending == 1 and self.on_busy:
+                self.on_busy(True)
+        self._pool.submit(self._run, task, fn, args, on_done, on_error or self.on_error)
+        return task
+
+    def call_soon(self, fn, *args):
+        """Schedules fn(*args) on the Tk thread; safe to call from any thread"""
+        self._results.put((None, fn, args))
+
+    def cancel(self, key):
+        task = self._latest.pop(key, None)
+        if task:
+            task.cancel()
+
+    def shutdown(self):
+        self._closed = True
+        for task in self._latest.values():
+            task.cancel()
+        self._latest.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._poll_id:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None
+
+    # ---------- internals ----------
+    def _run(self, task, fn, args, on_done, on_error):
+        if task.cancelled:
+            self._results.put((task, None, ()))
+            return
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self._results.put((task, on_error, (e,)))
+        else:
+            self._results.put((task, on_done, (result,)))
+
+    def _poll(self):
+        self._poll_id = None
+        try:
+            while not self._closed:
+                try:
+                    task, callback, args = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    if task is not None:
+                        self._finish(task)
+                        if task.cancelled:
+                            continue
+                    if callback:
+                        callback(*args)
+                except Exception as e:
+                    self._callback_failed(e)
+        finally:
+            # a failing callback must not stop the polling for every later result
+            if not self._closed:
+                try:
+                    self._poll_id = self.root.after(POLL_MS, self._poll)
+                except tk.TclError:      # root destroyed by a callback
+                    self.shutdown()
+
+    def _callback_failed(self, e):
+        if self.on_error:
+            self.on_error(e)
+        else:
+            self.root.report_callback_exception(type(e), e, e.__traceback__)
+
+    def _finish(self, task):
+        if task.key is not None and self._latest.get(task.key) is task:
+            del self._latest[task.key]
+        if not task.busy:
+            return
+        self._pending -= 1
+        if self._pending == 0 and self.on_busy:
+            self.on_busy(False)
@@ -0,0 +1,182 @@
+# db_viewer/exporter.py
+"""Streaming export of students.db / users.db to CSV, JSONL or a compact columnar file.
+
+    python exporter.py students.db students.csv
+    python exporter.py users.db users.col --format columnar
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+
+try:
+    from .database import table_reader, EXPORT_CHUNK
+except ImportError:
+    from database import table_reader, EXPORT_CHUNK
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".col": "columnar"}
+
+
+# ==================== ROW FORMATS ====================
+def write_csv(f, columns, chunks):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield len(chunk)
+
+
+def write_jsonl(f, columns, chunks):
+    for chunk in chunks:
+        f.write("".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in chunk))
+        yield len(chunk)
+
+
+# ==================== COLUMNAR FORMAT ====================
+# Layout (little-endian):
+#   MAGIC, u32 header length, JSON header {"columns": [...]}
+#   row groups, one per chunk: u32 row count, then per column:
+#       u8 type (i=int64, f=float64, s=utf-8 text, b=blob, n=all NULL)
+#       validity bitmap, ceil(rows/8) bytes, bit set = value present
+#       i/f: rows * 8 bytes (NULLs stored as 0)
+#       s/b: u32 offsets[rows + 1], then the concatenated bytes
+#   u32 0 terminates the groups, followed by u64 total rows
+MAGIC = b"SMCOL1\n"
+_LITTLE = sys.byteorder == "little"
+
+
+def _packed(arr):
+    if not _LITTLE:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpacked(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if not _LITTLE:
+        arr.byteswap()
+    return arr
+
+
+def _column_type(values):
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return "n"
+    if kinds <= {int}:
+        return "i"
+    if kinds <= {int, float}:
+        return "f"
+    if kinds <= {bytes}:
+        return "b"
+    return "s"
+
+
+def _encode_column(values):
+    kind = _column_type(values)
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, v in enumerate(values):
+        if v is not None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    parts = [kind.encode(), bytes(bitmap)]
+    if kind == "i":
+        parts.append(_packed(array("q", (0 if v is None else v for v in values))))
+    elif kind == "f":
+        parts.append(_packed(array("d", (0.0 if v is None else float(v) for v in values))))
+    elif kind in "sb":
+        blobs = [b"" if v is None else v if kind == "b" else str(v).encode() for v in values]
+        offsets = array("I", [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        parts.append(_packed(offsets))
+        parts.append(b"".join(blobs))
+    return b"".join(parts)
+
+
+def write_columnar(f, columns, chunks):
+    header = json.dumps({"columns": columns}).encode()
+    f.write(MAGIC + struct.pack("<I", len(header)) + header)
+    total = 0
+    for chunk in chunks:
+        f.write(struct.pack("<I", len(chunk)))
+        for values in zip(*chunk):
+            f.write(_encode_column(values))
+        total += len(chunk)
+        yield len(chunk)
+    f.write(struct.pack("<IQ", 0, total))
+
+
+def read_columnar(path):
+    """Yields (columns, {column: values}) per row group of a columnar export"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        (size,) = struct.unpack("<I", f.read(4))
+        columns = json.loads(f.read(size))["columns"]
+        while True:
+            (rows,) = struct.unpack("<I", f.read(4))
+            if rows == 0:
+                return
+            group = {}
+            for col in columns:
+                kind = f.read(1).decode()
+                bitmap = f.read((rows + 7) // 8)
+                present = [bitmap[i >> 3] >> (i & 7) & 1 for i in range(rows)]
+                if kind == "n":
+                    values = [None] * rows
+                elif kind in "if":
+                    values = _unpacked("q" if kind == "i" else "d", f.read(8 * rows)).tolist()
+                else:
+                    offsets = _unpacked("I", f.read(4 * (rows + 1)))
+                    data = f.read(offsets[-1])
+                    values = [data[offsets[i]:offsets[i + 1]] for i in range(rows)]
+                    if kind == "s":
+                        values = [v.decode() for v in values]
+                group[col] = [v if p else None for v, p in zip(values, present)]
+            yield columns, group
+
+
+# ==================== EXPORT ====================
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "columnar": write_columnar}
+
+
+def export_table(db_name, path, fmt=None, chunk_size=EXPORT_CHUNK, progress=None):
+    """Writes the table of db_name to path chunk by chunk; memory stays bounded
+    by chunk_size. The file appears atomically when the export completes.
+    progress(rows_written) is called after every chunk. Returns the row count."""
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+    binary = fmt == "columnar"
+    tmp = path + ".part"
+    written = 0
+    try:
+        with table_reader(db_name, chunk_size) as (columns, chunks), \
+                open(tmp, "wb" if binary else "w", newline=None if binary else "", encoding=None if binary else "utf-8") as f:
+            for count in WRITERS[fmt](f, columns, chunks):
+                written += count
+                if progress:
+                    progress(written)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export students.db / users.db without loading it into memory")
+    parser.add_argument("database", help="students.db or users.db")
+    parser.add_argument("output", help="destination file (.csv, .jsonl or .col)")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="override detection from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK)
+    args = parser.parse_args(argv)
+
+    rows = export_table(args.database, args.output, args.format, args.chunk_size)
+    print(f"Exported {rows} rows from {args.database} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+# db_viewer/importer.py
+"""Bulk roster import: streams JSON / JSONL / CSV files into students.db and users.db.
+
+    python importer.py roster.json --default-password changeme
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+try:
+    from .database import (accounts, init_databases, notify, bump_student_sequence, reserve_student_ids,
+                           AUTH, SUBJECTS)
+    from .passwords import HashPool
+except ImportError:
+    from database import (accounts, init_databases, notify, bump_student_sequence, reserve_student_ids,
+                          AUTH, SUBJECTS)
+    from passwords import HashPool
+
+BATCH_SIZE = 5000
+READ_CHUNK = 1 << 16
+MAX_ERRORS = 20          # how many rejected-record messages the report keeps
+SEQUENCE_ID = re.compile(r"S(\d+)$")
+
+
+# ==================== READERS ====================
+def iter_json_array(f):
+    """Yields the objects of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(READ_CHUNK)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip(" \t\r\n")
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("Expected a JSON array of student records")
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of JSON array")
+        if buf[pos] == "]":
+            return
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()                      # record is split across chunks
+                continue
+            # a number at the very end of the buffer may still be incomplete
+            if end == len(buf) and not eof:
+                fill()
+                continue
+            pos = end
+            yield obj
+            break
+
+
+def iter_jsonl(f):
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_records(path, fmt=None):
+    """Streams raw records from a .json (array), .jsonl or .csv file"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt in ("jsonl", "ndjson"):
+            yield from iter_jsonl(f)
+        else:
+            # .json may still be line-delimited; peek at the first character
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            yield from (iter_json_array(f) if first == "[" else iter_jsonl(f))
+
+
+# ==================== VALIDATION ====================
+def _grade(record, subject):
+    for field in (subject, f"{subject}_grade"):
+        value = record.get(field)
+        if value not in (None, ""):
+            grade = float(value)
+            if not 0 <= grade <= 100:
+                raise ValueError(f"{subject} grade {grade} is outside 0-100")
+            return grade
+    return None
+
+
+def normalize(record, today, base_dir=""):
+    """Maps one raw record to (student row, password); raises ValueError if unusable.
+    The row id is None when the record has none and one must be allocated.
+    A relative image/photo path is taken relative to base_dir (the roster's folder)."""
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    sid = str(record.get("id") or "").strip() or None
+
+    name = str(record.get("name") or "").strip()
+    surname = str(record.get("surname") or "").strip()
+    if name and not surname and " " in name:
+        name, surname = name.rsplit(" ", 1)
+    if not name:
+        raise ValueError("missing name")
+
+    email = str(record.get("email") or "").strip() or None
+    if email and ("@" not in email or "." not in email.split("@")[-1]):
+        email = None                        # keep the student, drop the unusable address
+
+    try:
+        grades = [_grade(record, s) for s in SUBJECTS]
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"bad grade: {e}")
+
+    added = str(record.get("added_date") or today)
+    photo = str(record.get("photo") or record.get("image") or "").strip() or None
+    if photo:
+        photo = os.path.normpath(os.path.join(base_dir, photo))
+    password = record.get("password")
+    return (sid, name, surname, email, *grades, added, photo), (str(password) if password else None)
+
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.written = 0          # students inserted (or, with update=True, inserted/overwritten)
+        self.duplicates = 0       # repeated ids in the file, or already in the database
+        self.invalid = 0
+        self.users = 0
+        self.errors = []
+
+    def reject(self, line, reason):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"record {line}: {reason}")
+
+    def __str__(self):
+        return (f"read {self.read}, written {self.written}, "
+                f"duplicates {self.duplicates}, invalid {self.invalid}, logins {self.users}")
+
+
+# ==================== IMPORT ====================
+INSERT_STUDENT = '''INSERT INTO students
+    (id, name, surname, email, english, history, math, science, art, added_date, photo)
+    VALUES (?,?,?,?,?,?,?,?,?,?,?)'''
+UPSERT_TAIL = ''' ON CONFLICT(id) DO UPDATE SET name=excluded.name, surname=excluded.surname,
+    email=excluded.email, english=excluded.english, history=excluded.history, math=excluded.math,
+    science=excluded.science, art=excluded.art, photo=excluded.photo'''
+
+
+class ImportIds:
+    """Student ids of one import. Explicit ids in the file win: records
+    without one are given ids only when their batch is written, after the
+    sequence has moved past every explicit "S###" id read so far."""
+
+    def __init__(self):
+        self.seen = set()           # every id the file has used so far
+        self.allocated = set()      # ids given to records without one
+        self.reclaimed = set()      # allocated ids that a later explicit record asks for
+        self.max_seq = 0
+
+    def claim(self, sid):
+        """Records an explicit id; False when an earlier record already has it"""
+        if sid in self.allocated:
+            self.allocated.discard(sid)
+            self.reclaimed.add(sid)
+        elif sid in self.seen:
+            return False
+        self.seen.add(sid)
+        match = SEQUENCE_ID.match(sid)
+        if match:
+            self.max_seq = max(self.max_seq, int(match.group(1)))
+        return True
+
+    def _take(self, conn, count):
+        taken = []
+        while len(taken) < count:
+            taken += [sid for sid in reserve_student_ids(conn, count - len(taken)) if sid not in self.seen]
+        self.seen.update(taken)
+        self.allocated.update(taken)
+        return taken
+
+    def assign(self, conn, rows):
+        """rows with every None id replaced, inside the batch's transaction"""
+        bump_student_sequence(self.max_seq, conn)
+        # an earlier batch gave an id-less record an id the file uses later: renumber that record
+        for sid in self.reclaimed:
+            new = self._take(conn, 1)[0]
+            conn.execute("UPDATE students SET id=? WHERE id=?", (new, sid))
+            conn.execute(f"UPDATE {AUTH}.users SET username=? WHERE username=?", (new, sid))
+        self.reclaimed.clear()
+        fresh = iter(self._take(conn, sum(row[0] is None for row in rows)))
+        return [row if row[0] is not None else (next(fresh),) + row[1:] for row in rows]
+
+
+def _write_batch(rows, passwords, ids, update, report, hasher, cost):
+    # hash before the transaction opens, then students and logins commit together
+    wanted = [password for password in passwords if password]
+    hashes = iter(hasher.hash_many(wanted, cost) if wanted else [])
+    with accounts() as conn:
+        students = ids.assign(conn, rows)
+        # cursor.rowcount, unlike total_changes, leaves out the search-index trigger writes
+        if update:
+            written = conn.executemany(INSERT_STUDENT + UPSERT_TAIL, students).rowcount
+        else:
+            written = conn.executemany(INSERT_STUDENT + " ON CONFLICT(id) DO NOTHING", students).rowcount
+        if wanted:
+            report.users += conn.executemany(
+                f"INSERT INTO {AUTH}.users (username, password, role) VALUES (?,?,'student') "
+                "ON CONFLICT(username) DO NOTHING",
+                [(row[0], next(hashes)) for row, password in zip(students, passwords) if password]).rowcount
+    report.written += written
+    if not update:
+        report.duplicates += len(students) - written
+
+
+def import_file(path, fmt=None, batch_size=BATCH_SIZE, default_password=None, update=False, progress=None,
+                workers=None, kdf_cost=None):
+    """Imports a roster file in batches of batch_size rows, one transaction per batch.
+
+    Records are validated and de-duplicated by id (first occurrence wins);
+    records without an id get exactly the ids their batch needs from the id
+    sequence, never one that an explicit id in the file uses.
+    With update=True existing students are overwritten instead of skipped.
+    Logins are created for records carrying a password, or default_password;
+    their KDF hashing is spread over `workers` processes (kdf_cost overrides
+    the scrypt cost). progress(report) is called after every batch.
+    Returns the ImportReport.
+    """
+    init_databases()
+    report = ImportReport()
+    today = datetime.now().strftime("%Y-%m-%d")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    ids = ImportIds()
+    rows, passwords = [], []
+
+    with HashPool(workers) as hasher:
+        for line, record in enumerate(iter_records(path, fmt), 1):
+            report.read += 1
+            try:
+                row, password = normalize(record, today, base_dir)
+            except ValueError as e:
+                report.reject(line, e)
+                continue
+            if row[0] is not None and not ids.claim(row[0]):
+                report.duplicates += 1
+                continue
+
+            rows.append(row)
+            passwords.append(password or default_password)
+
+            if len(rows) >= batch_size:
+                _write_batch(rows, passwords, ids, update, report, hasher, kdf_cost)
+                rows, passwords = [], []
+                if progress:
+                    progress(report)
+
+        if rows:
+            _write_batch(rows, passwords, ids, update, report, hasher, kdf_cost)
+    if progress:
+        progress(report)
+    notify("reload", "students", None)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a student roster into students.db / users.db")
+    parser.add_argument("path", help="roster file (.json array, .jsonl or .csv)")
+    parser.add_argument("--format", choices=["json", "jsonl", "csv"], help="override format detection")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--default-password", help="password for records without one (no login otherwise)")
+    parser.add_argument("--update", action="store_true", help="overwrite students that already exist")
+    parser.add_argument("--workers", type=int, help="password hashing processes (default: one per CPU)")
+    parser.add_argument("--kdf-cost", type=int, help="scrypt N for new logins (default: passwords.SCRYPT_N)")
+    args = parser.parse_args(argv)
+
+    report = import_file(args.path, args.format, args.batch_size, args.default_password, args.update,
+                         progress=lambda r: print(f"\r{r.read} records…", end="", file=sys.stderr),
+                         workers=args.workers, kdf_cost=args.kdf_cost)
+    print(file=sys.stderr)
+    print(report)
+    for error in report.errors:
+        print("  " + error)
+
+
+if __name__ == "__main__":
+    main()
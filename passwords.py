@@ -0,0 +1,113 @@
+# db_viewer/passwords.py
+"""Salted, tunable-cost password hashing on the stdlib KDFs.
+
+Hashes are self-describing so parameters can change without breaking old
+accounts:
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+Bare 64-char hex strings are the legacy unsalted SHA-256 hashes; they still
+verify, and report that they need an upgrade.
+"""
+import base64
+import hashlib
+import hmac
+import os
+
+try:
+    from .tracing import traced, span
+    from .processes import spawn_pool
+except ImportError:
+    from tracing import traced, span
+    from processes import spawn_pool
+
+SCHEME = "scrypt"
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + (1 << 20), dklen=KEY_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+@traced("hash")
+def hash_password(password, scheme=SCHEME, cost=None):
+    """Returns a self-describing salted hash; cost overrides n / iterations"""
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "scrypt":
+        n = cost or SCRYPT_N
+        return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(_scrypt(password, salt, n, SCRYPT_R, SCRYPT_P))}"
+    if scheme == "pbkdf2_sha256":
+        iterations = cost or PBKDF2_ITERATIONS
+        return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+    raise ValueError(f"Unknown password scheme {scheme!r}")
+
+
+@traced("hash")
+def verify_password(password, stored):
+    """Returns (matches, needs_rehash) for a stored hash of any supported format"""
+    parts = stored.split("$")
+    if parts[0] == "scrypt" and len(parts) == 6:
+        n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+        ok = hmac.compare_digest(_scrypt(password, _unb64(parts[4]), n, r, p), _unb64(parts[5]))
+        return ok, ok and (SCHEME != "scrypt" or (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P))
+    if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        iterations = int(parts[1])
+        ok = hmac.compare_digest(_pbkdf2(password, _unb64(parts[2]), iterations), _unb64(parts[3]))
+        return ok, ok and (SCHEME != "pbkdf2_sha256" or iterations != PBKDF2_ITERATIONS)
+    if len(stored) == 64:                      # legacy sha256(password).hexdigest()
+        ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored.lower())
+        return ok, ok
+    return False, False
+
+
+class HashPool:
+    """Spreads hash_password over worker processes for bulk provisioning.
+
+    Workers start lazily, and batches too small to be worth the round trip
+    are hashed in-process.
+    """
+
+    def __init__(self, workers=None, chunksize=16):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._pool = None
+
+    def hash_many(self, passwords, cost=None):
+        passwords = list(passwords)
+        if len(passwords) < 2 * self.chunksize or self.workers == 1:
+            return [hash_password(p, cost=cost) for p in passwords]
+        if self._pool is None:
+            self._pool = spawn_pool(self.workers)
+        with span("hash", "HashPool.hash_many", passwords=len(passwords)):
+            return list(self._pool.map(hash_password, passwords, [SCHEME] * len(passwords),
+                                       [cost] * len(passwords), chunksize=self.chunksize))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
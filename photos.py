@@ -0,0 +1,181 @@
+# db_viewer/photos.py
+"""Student photo thumbnails: a bounded on-disk cache plus an LRU of PhotoImages.
+
+A photo's path, mtime and size pick its content hash (hashed again only
+when the file changes) and the hash names the thumbnail, so an edited
+photo gets a new thumbnail and a copied one reuses it. With Pillow
+installed thumbnails are made on worker threads. Without it, PNG/GIF
+photos that have no thumbnail yet are decoded by Tk, which only runs on
+the UI thread: one photo per idle tick, so a page of new cards never
+blocks scrolling. Other formats show nothing.
+"""
+import hashlib
+import os
+import threading
+import tkinter as tk
+from collections import OrderedDict, deque
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+THUMB_DIR = "thumbnails"
+THUMB_SIZE = 96              # longest side, px
+DISK_LIMIT = 64 << 20        # bytes of thumbnails kept on disk
+MEMORY_LIMIT = 16 << 20      # bytes of decoded PhotoImages kept in memory
+TK_FORMATS = (".png", ".gif", ".ppm", ".pgm")
+HASH_CHUNK = 1 << 16
+
+
+class ThumbnailStore:
+    """The on-disk cache; safe to use from any thread"""
+
+    def __init__(self, directory=THUMB_DIR, size=THUMB_SIZE, limit=DISK_LIMIT):
+        self.directory = directory
+        self.size = size
+        self.limit = limit
+        self._digests = {}       # (path, mtime_ns, size) -> content hash
+        self._used = None        # bytes on disk, counted on the first write
+        self._lock = threading.Lock()
+
+    def _digest(self, path):
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            with self._lock:
+                self._digests[key] = digest
+        return digest
+
+    def prepare(self, path):
+        """(thumbnail path, exists) for a photo, making the thumbnail with
+        Pillow when it is available; raises OSError for an unreadable photo"""
+        thumb = os.path.join(self.directory, f"{self._digest(path)}-{self.size}.png")
+        if os.path.exists(thumb):
+            os.utime(thumb)              # recently used thumbnails survive pruning
+            return thumb, True
+        if Image is None:
+            return thumb, False
+        with Image.open(path) as im:
+            im.thumbnail((self.size, self.size))
+            if im.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                im = im.convert("RGBA")          # e.g. CMYK JPEGs, which PNG can't hold
+            self.save(thumb, lambda tmp: im.save(tmp, "PNG"))
+        self.add(thumb)
+        return thumb, True
+
+    def save(self, thumb, write):
+        """Writes a thumbnail through write(temp path); add() it afterwards"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{thumb}.{threading.get_ident()}.tmp"
+        write(tmp)
+        os.replace(tmp, thumb)
+
+    def add(self, thumb):
+        """Counts a new thumbnail, then prunes the least recently used ones
+        while the cache is over its limit"""
+        added = os.path.getsize(thumb)
+        with self._lock:
+            if self._used is None:
+                self._used = sum(e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith(".png"))
+            else:
+                self._used += added
+            if self._used <= self.limit:
+                return
+            entries = sorted((e for e in os.scandir(self.directory) if e.name.endswith(".png")),
+                             key=lambda e: e.stat().st_mtime)
+            for entry in entries:
+                if self._used <= self.limit * 0.9:
+                    break
+                if entry.path == thumb:
+                    continue
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    self._used -= size
+                except OSError:
+                    pass
+
+
+class ThumbnailCache:
+    """PhotoImage thumbnails for photo paths, made in the background and
+    kept in an LRU bounded by decoded size. Use from the Tk thread only."""
+
+    def __init__(self, executor, store=None, limit=MEMORY_LIMIT):
+        self.executor = executor
+        self.store = store or ThumbnailStore()
+        self.limit = limit
+        self._images = OrderedDict()     # photo path -> PhotoImage
+        self._bytes = 0
+        self._waiting = {}               # photo path -> callbacks
+        self._failed = set()             # missing or unreadable photos, not retried
+        self._to_shrink = deque()        # (photo path, thumbnail path) left for Tk to decode
+
+    def request(self, path, on_ready):
+        """on_ready(PhotoImage) right away when cached, otherwise once the
+        thumbnail is ready; never called for a missing or unreadable photo"""
+        if not path or path in self._failed:
+            return
+        image = self._images.get(path)
+        if image is not None:
+            self._images.move_to_end(path)
+            on_ready(image)
+            return
+        if path in self._waiting:
+            self._waiting[path].append(on_ready)
+            return
+        self._waiting[path] = [on_ready]
+        self.executor.submit(self.store.prepare, path, busy=False,
+                             on_done=lambda result: self._loaded(path, *result),
+                             on_error=lambda e: self._fail(path))
+
+    def _fail(self, path):
+        self._waiting.pop(path, None)
+        self._failed.add(path)
+
+    def _loaded(self, path, thumb, exists):
+        if not exists:
+            if os.path.splitext(path)[1].lower() not in TK_FORMATS:
+                return self._fail(path)
+            self._to_shrink.append((path, thumb))
+            if len(self._to_shrink) == 1:
+                self.executor.root.after_idle(self._shrink_next)
+            return
+        try:
+            image = tk.PhotoImage(file=thumb)
+        except tk.TclError:
+            return self._fail(path)      # not an image Tk can read
+        self._ready(path, image)
+
+    def _ready(self, path, image):
+        callbacks = self._waiting.pop(path, [])
+        self._images[path] = image
+        self._bytes += image.width() * image.height() * 4
+        while self._bytes > self.limit and len(self._images) > 1:
+            _, old = self._images.popitem(last=False)
+            self._bytes -= old.width() * old.height() * 4
+        for on_ready in callbacks:
+            on_ready(image)
+
+    def _shrink_next(self):
+        # no Pillow: Tk decodes the full photo once and only the thumbnail is kept
+        path, thumb = self._to_shrink.popleft()
+        if self._to_shrink:
+            self.executor.root.after_idle(self._shrink_next)
+        try:
+            full = tk.PhotoImage(file=path)
+            factor = max(1, -(-max(full.width(), full.height()) // self.store.size))
+            image = full.subsample(factor)
+            self.store.save(thumb, lambda tmp: image.write(tmp, format="png"))
+        except (tk.TclError, OSError):
+            return self._fail(path)
+        # counting and pruning the disk cache scans the folder: not on the UI thread
+        self.executor.submit(self.store.add, thumb, busy=False)
+        self._ready(path, image)
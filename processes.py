@@ -0,0 +1,14 @@
+# db_viewer/processes.py
+"""Worker process pools for CPU-bound bulk jobs: password hashing and report cards."""
+
+
+def spawn_pool(workers):
+    """A ProcessPoolExecutor with `workers` processes started by spawn.
+
+    Not fork: the callers may be running Tk and worker threads, and a
+    forked child inherits their locks and sockets in whatever state they
+    were in. multiprocessing is imported here rather than at the top, so
+    the login window and other single-hash paths never pay for it."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
@@ -0,0 +1,207 @@
+# db_viewer/reports.py
+"""End-of-term report cards: one HTML and/or text file per student plus a class summary.
+
+    python reports.py reports/ --term "Spring 2026"
+
+Students stream out of one read transaction, so every card and the class
+summary describe the same snapshot. Chunks of rows are rendered and
+written by a pool of worker processes, with a bounded number of chunks
+in flight; small classes are rendered in-process.
+"""
+import argparse
+import html
+import os
+import re
+import sys
+from datetime import datetime
+
+try:
+    from .database import connection, DB_STUDENTS, SUBJECTS
+    from .processes import spawn_pool
+    from .analytics import compute_summary, fmt_grade, band_color, band_label, BANDS, PERCENTILES, STAT_COLUMNS
+except ImportError:
+    from database import connection, DB_STUDENTS, SUBJECTS
+    from processes import spawn_pool
+    from analytics import compute_summary, fmt_grade, band_color, band_label, BANDS, PERCENTILES, STAT_COLUMNS
+
+FORMATS = ("html", "txt")
+CHUNK_SIZE = 500
+IN_FLIGHT = 2            # chunks queued per worker
+SUMMARY_NAME = "class_summary"
+
+# ranked by average within the same snapshot; ungraded students get no rank
+REPORT_QUERY = f"""SELECT id, name, surname, {", ".join(SUBJECTS)}, average,
+                          CASE WHEN average IS NULL THEN NULL
+                               ELSE RANK() OVER (ORDER BY average DESC) END
+                   FROM students ORDER BY id"""
+
+
+def file_stem(student_id):
+    return re.sub(r"[^\w.-]", "_", str(student_id)) or "_"
+
+
+# ==================== STUDENT CARDS ====================
+CARD_CSS = """body{font-family:Helvetica,Arial,sans-serif;color:#1e293b;margin:40px}
+h1{margin:0}.sub{color:#64748b;margin:4px 0 24px}
+table{border-collapse:collapse;min-width:480px}th,td{padding:8px 14px;border-bottom:1px solid #e2e8f0;text-align:left}
+td.n{text-align:right}.avg{font-size:48px;font-weight:bold}"""
+
+
+def render_html(row, context):
+    sid, name, surname, *grades, average, rank = row
+    e = html.escape
+    lines = [f"<!doctype html><html><head><meta charset='utf-8'><title>{e(name)} {e(surname)}</title>",
+             f"<style>{CARD_CSS}</style></head><body>",
+             f"<h1>{e(name)} {e(surname)}</h1>",
+             f"<p class='sub'>{e(str(sid))} &middot; {e(context['term'])}</p>",
+             f"<p class='avg' style='color:{band_color(average)}'>{fmt_grade(average)}</p>",
+             f"<p>Class rank: {rank} of {context['ranked']}</p>" if rank else "<p>Not ranked: no grades yet</p>",
+             "<table><tr><th>Subject</th><th>Grade</th><th>Band</th><th>Class mean</th></tr>"]
+    for subject, grade in zip(SUBJECTS, grades):
+        lines.append(f"<tr><td>{subject.title()}</td><td class='n' style='color:{band_color(grade)}'>{fmt_grade(grade)}</td>"
+                     f"<td>{band_label(grade)}</td><td class='n'>{fmt_grade(context['means'][subject])}</td></tr>")
+    lines.append(f"</table><p class='sub'>Generated {e(context['generated'])}</p></body></html>\n")
+    return "\n".join(lines)
+
+
+def render_text(row, context):
+    sid, name, surname, *grades, average, rank = row
+    lines = [f"REPORT CARD — {context['term']}", "",
+             f"{name} {surname} ({sid})",
+             f"Average: {fmt_grade(average)}" + (f"   Class rank: {rank} of {context['ranked']}" if rank else ""), "",
+             f"{'Subject':<10} {'Grade':>6}  {'Band':<6} {'Class mean':>10}"]
+    for subject, grade in zip(SUBJECTS, grades):
+        lines.append(f"{subject.title():<10} {fmt_grade(grade):>6}  {band_label(grade):<6} {fmt_grade(context['means'][subject]):>10}")
+    lines += ["", f"Generated {context['generated']}", ""]
+    return "\n".join(lines)
+
+
+RENDERERS = {"html": render_html, "txt": render_text}
+
+
+def render_chunk(rows, context, out_dir, formats):
+    """Renders and writes the cards for a chunk of rows; returns how many
+    students were written. Runs in the worker processes."""
+    for row in rows:
+        stem = os.path.join(out_dir, file_stem(row[0]))
+        for fmt in formats:
+            with open(f"{stem}.{fmt}", "w", encoding="utf-8") as f:
+                f.write(RENDERERS[fmt](row, context))
+    return len(rows)
+
+
+# ==================== CLASS SUMMARY ====================
+def render_summary_html(summary, context):
+    e = html.escape
+    heads = ["Subject", "Students", "Mean", "Median", "Std dev", "Min", "Max"] + \
+            [f"P{p}" for p in PERCENTILES if p != 50] + [label for label, _, _ in BANDS]
+    lines = [f"<!doctype html><html><head><meta charset='utf-8'><title>Class summary</title>",
+             f"<style>{CARD_CSS}</style></head><body>",
+             f"<h1>Class summary</h1><p class='sub'>{e(context['term'])} &middot; {summary['students']} students</p>",
+             "<table><tr>" + "".join(f"<th>{h}</th>" for h in heads) + "</tr>"]
+    for col in STAT_COLUMNS:
+        s = summary["columns"][col]
+        cells = [s["count"]] + [fmt_grade(s[k]) for k in ("mean", "median", "stdev", "min", "max")]
+        cells += [fmt_grade(s[f"p{p}"]) for p in PERCENTILES if p != 50] + s["bands"]
+        lines.append(f"<tr><td>{col.title()}</td>" + "".join(f"<td class='n'>{c}</td>" for c in cells) + "</tr>")
+    lines.append("</table><h2>Top students</h2><ol>")
+    for rank, sid, name, surname, avg in summary["top"]:
+        lines.append(f"<li value='{rank}'>{e(name)} {e(surname)} ({e(str(sid))}) &mdash; {avg:.1f}</li>")
+    lines.append(f"</ol><p class='sub'>Generated {e(context['generated'])}</p></body></html>\n")
+    return "\n".join(lines)
+
+
+def render_summary_text(summary, context):
+    lines = [f"CLASS SUMMARY — {context['term']} ({summary['students']} students)", "",
+             f"{'Subject':<10} {'N':>6} {'Mean':>6} {'Median':>6} {'SD':>6} {'Min':>6} {'Max':>6}  "
+             + " ".join(f"{label:>6}" for label, _, _ in BANDS)]
+    for col in STAT_COLUMNS:
+        s = summary["columns"][col]
+        lines.append(f"{col.title():<10} {s['count']:>6} "
+                     + " ".join(f"{fmt_grade(s[k]):>6}" for k in ("mean", "median", "stdev", "min", "max"))
+                     + "  " + " ".join(f"{b:>6}" for b in s["bands"]))
+    lines += ["", "Top students"]
+    lines += [f"{rank:>3}. {name} {surname} ({sid})  {avg:.1f}" for rank, sid, name, surname, avg in summary["top"]]
+    lines += ["", f"Generated {context['generated']}", ""]
+    return "\n".join(lines)
+
+
+SUMMARY_RENDERERS = {"html": render_summary_html, "txt": render_summary_text}
+
+
+# ==================== GENERATE ====================
+def _chunks(cursor, size):
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def generate_reports(out_dir, formats=FORMATS, term=None, workers=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Writes a report card per student and the class summary into out_dir.
+
+    progress(done, total) is called after every chunk; from a worker
+    thread when this runs on the UI executor. Returns the student count."""
+    formats = tuple(formats)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    written = 0
+
+    with connection(DB_STUDENTS) as conn:
+        conn.execute("BEGIN")          # one snapshot for the summary and every card
+        summary = compute_summary(conn)
+        total = summary["students"]
+        context = {"term": term or datetime.now().strftime("Term ending %Y-%m-%d"),
+                   "generated": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                   "ranked": summary["columns"]["average"]["count"],
+                   "means": {s: summary["columns"][s]["mean"] for s in SUBJECTS}}
+        for fmt in formats:
+            with open(os.path.join(out_dir, f"{SUMMARY_NAME}.{fmt}"), "w", encoding="utf-8") as f:
+                f.write(SUMMARY_RENDERERS[fmt](summary, context))
+
+        chunks = _chunks(conn.execute(REPORT_QUERY), chunk_size)
+        if workers == 1 or total <= 2 * chunk_size:
+            for rows in chunks:
+                written += render_chunk(rows, context, out_dir, formats)
+                if progress:
+                    progress(written, total)
+            return written
+
+        from concurrent.futures import wait, FIRST_COMPLETED
+        with spawn_pool(workers) as pool:
+            pending = set()
+            for rows in chunks:
+                pending.add(pool.submit(render_chunk, rows, context, out_dir, formats))
+                if len(pending) >= workers * IN_FLIGHT:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        written += future.result()
+                        if progress:
+                            progress(written, total)
+            for future in pending:
+                written += future.result()
+                if progress:
+                    progress(written, total)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write report cards for every student in students.db")
+    parser.add_argument("output", help="directory for the report files")
+    parser.add_argument("--format", choices=FORMATS, action="append",
+                        help="html and/or txt (default: both)")
+    parser.add_argument("--term", help="term title printed on every card")
+    parser.add_argument("--workers", type=int, help="rendering processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    start = datetime.now()
+    count = generate_reports(args.output, args.format or FORMATS, args.term, args.workers, args.chunk_size,
+                             progress=lambda done, total: print(f"\r{done}/{total} students…", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    print(f"Wrote {count} report cards to {args.output} in {(datetime.now() - start).total_seconds():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,13 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
 import os
+import sys
 
-DB_STUDENTS = "students.db"
-DB_USERS = "users.db"
+# database.py lives in the project folder next to studenttracker.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import sorted_pager, close_all, DB_STUDENTS, DB_USERS
+from widgets import PagedTreeview, FilterBar
 
 class DBViewer:
     def __init__(self):
@@ -29,20 +31,17 @@ class DBViewer:
         combo = ttk.Combobox(control_frame, textvariable=self.db_var,
                              values=[DB_STUDENTS, DB_USERS], state="readonly", font=("Helvetica", 16), width=20)
         combo.pack(side="left", padx=10)
+        combo.bind("<<ComboboxSelected>>", lambda e: self.switch_db())
 
         tk.Button(control_frame, text="Refresh", bg="#3b82f6", fg="white",
                   font=("Helvetica", 16, "bold"), command=self.load_data, padx=30, pady=12).pack(side="left", padx=30)
 
-        # Treeview
-        tree_frame = tk.Frame(self.root)
-        tree_frame.pack(fill="both", expand=True, padx=50, pady=20)
-
-        self.tree = ttk.Treeview(tree_frame, show="headings", height=22)
-        self.tree.pack(side="left", fill="both", expand=True)
-
-        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Column filters, then a treeview that only loads the visible rows
+        self.sort = None          # (column, descending)
+        self.filters = {}
+        self.filter_bar = FilterBar(self.root, self.apply_filters)
+        self.view = PagedTreeview(self.root, on_heading=self.sort_by)
+        self.tree = self.view.tree
 
         # Style
         style = ttk.Style()
@@ -54,43 +53,44 @@ class DBViewer:
                  font=("Helvetica", 13), bg="#1e293b", fg="#94a3b8").pack(pady=20)
 
         self.load_data()
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            close_all()
 
     def load_data(self):
         db_name = self.db_var.get()
         if not os.path.exists(db_name):
             messagebox.showwarning("Not Found", f"{db_name} not found!\nRun your main app first to create it.")
-            self.tree["columns"] = ()
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            self.view.set_source((), 0, lambda offset, limit: [])
             self.root.title("DB Viewer - No Database")
             return
 
         try:
-            conn = sqlite3.connect(db_name)
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM students" if db_name == DB_STUDENTS else "SELECT * FROM users")
-            rows = cur.fetchall()
-            columns = [desc[0] for desc in cur.description]
-            conn.close()
-
-            # Setup columns
-            self.tree["columns"] = columns
-            for col in columns:
-                self.tree.heading(col, text=col.title())
-                self.tree.column(col, width=180, anchor="center")
-
-            # Clear & insert data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            for row in rows:
-                self.tree.insert("", "end", values=row)
-
-            self.root.title(f"DB Viewer • {db_name} ({len(rows)} records)")
+            order_by, descending = self.sort or (None, False)
+            pager = sorted_pager(db_name, order_by, descending, self.filters)
+            count = pager.count()
+            self.filter_bar.set_columns(pager.columns)
+            self.view.set_source(pager.columns, count, pager.fetch, sort=self.sort)
+            self.root.title(f"DB Viewer • {db_name} ({count} records)")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data:\n{e}")
 
+    def switch_db(self):
+        self.sort = None
+        self.filters = {}
+        self.load_data()
+
+    def sort_by(self, column):
+        descending = bool(self.sort and self.sort[0] == column and not self.sort[1])
+        self.sort = (column, descending)
+        self.load_data()
+
+    def apply_filters(self, filters):
+        self.filters = filters
+        self.load_data()
+
 # === RUN IT ===
 if __name__ == "__main__":
     DBViewer()
\ No newline at end of file
@@ -1,48 +1,49 @@
+import functools
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-import hashlib
-
-DB_NAME = "students.db"
-USERS_DB = "users.db"
-
-# ==================== DATABASE SETUP ====================
-def init_databases():
-    conn = sqlite3.connect(USERS_DB)
-    conn.execute('''CREATE TABLE IF NOT EXISTS users (
-                    username TEXT PRIMARY KEY, password TEXT NOT NULL, role TEXT NOT NULL)''')
-    if not conn.execute("SELECT 1 FROM users WHERE username='admin'").fetchone():
-        conn.execute("INSERT INTO users VALUES ('admin', ?, 'admin')", (hash_pwd('admin'),))
-    conn.commit()
-    conn.close()
-
-    conn = sqlite3.connect(DB_NAME)
-    conn.execute('''CREATE TABLE IF NOT EXISTS students (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    surname TEXT NOT NULL,
-                    email TEXT,
-                    english REAL, history REAL, math REAL, science REAL, art REAL,
-                    added_date TEXT)''')
-    conn.commit()
-    conn.close()
-
-def hash_pwd(p): return hashlib.sha256(p.encode()).hexdigest()
-
-def get_next_id():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM students ORDER BY id DESC LIMIT 1")
-    row = cur.fetchone()
-    conn.close()
-    return "S001" if not row else f"S{int(row[0][1:]) + 1:03d}"
+from database import (student_pager, close_all, subscribe, unsubscribe, init_databases,
+                      update_grades, update_grades_many, get_student, login, add_student_account, SUBJECTS)
+from passwords import hash_password
+from widgets import VirtualCardList, EditableGrid, TraceOverlay
+from photos import ThumbnailCache
+from tracing import traced, enable_from_env, TRACER
+from executor import BackgroundExecutor
+from importer import import_file
+from reports import generate_reports
+from analytics import (class_summary, student_rank, mean_grade, fmt_grade, band_color, BANDS, PERCENTILES,
+                       STAT_COLUMNS)
+
+CARD_COLUMNS = ["id", "name", "surname", "english", "history", "math", "science", "art", "average", "photo"]
+SHEET_COLUMNS = CARD_COLUMNS[:-1]
+FILTER_CHOICES = ["Any", "Average", "English", "History", "Math", "Science", "Art"]
+SEARCH_DEBOUNCE_MS = 250
+STAT_HEADINGS = ["Students", "Mean", "Median", "Std dev", "Min", "Max"] + [f"P{p}" for p in PERCENTILES if p != 50]
+
+
+def parse_grade(text):
+    """Grade cell text -> 0..100 float, or None when blank; ValueError otherwise"""
+    text = text.strip()
+    if not text:
+        return None
+    grade = float(text)
+    if not 0 <= grade <= 100:
+        raise ValueError(f"{grade} is outside 0-100")
+    return grade
+
+
+def sheet_values(values):
+    # no photo on the sheet, and the read-only average is rounded like the cards
+    *values, average, _photo = values
+    return tuple(values) + (None if average is None else round(average, 1),)
+
 
 # ==================== MAIN APP ====================
 class StudentManagerApp:
-    def __init__(self, username, role):
+    def __init__(self, username, role, profile=None):
         self.username = username
         self.role = role
+        self.profile = profile      # the student's own row, read together with the login
 
         self.root = tk.Tk()
         self.root.title("Student Manager Pro")
@@ -86,6 +87,22 @@ class StudentManagerApp:
         tk.Button(header, text="LOGOUT", bg="#ef4444", fg="white", font=("Helvetica", 16, "bold"),
                   padx=40, pady=15, command=self.logout).pack(side="right", padx=70, pady=40)
 
+        if role == "admin":
+            tk.Button(header, text="IMPORT ROSTER", bg="#3b82f6", fg="white", font=("Helvetica", 16, "bold"),
+                      padx=30, pady=15, command=self.import_roster).pack(side="right", pady=40)
+            tk.Button(header, text="REPORT CARDS", bg="#8b5cf6", fg="white", font=("Helvetica", 16, "bold"),
+                      padx=30, pady=15, command=self.write_reports).pack(side="right", padx=20, pady=40)
+
+        # Loading indicator while queries run in the background
+        self.status = tk.Label(header, text="", font=("Helvetica", 18, "italic"), bg="#0f172a", fg="#00d4aa")
+        self.status.pack(side="right", padx=20)
+        self.executor = BackgroundExecutor(self.root, on_busy=self.set_busy,
+                                           on_error=lambda e: messagebox.showerror("Database Error", str(e)))
+        self.thumbs = ThumbnailCache(self.executor)
+
+        if role == "admin":
+            self.create_search_bar()
+
         # Tabs
         self.notebook = ttk.Notebook(self.root, style="Big.TNotebook")
         self.notebook.pack(fill="both", expand=True, padx=50, pady=40)
@@ -94,29 +111,189 @@ class StudentManagerApp:
             self.create_admin_tabs()
         else:
             self.create_student_tab()
+        TraceOverlay.attach(self.root)
 
         self.root.mainloop()
+        unsubscribe(self.on_data_changed)
+        self.executor.shutdown()
 
     def logout(self):
+        unsubscribe(self.on_data_changed)
+        self.executor.shutdown()
         self.root.destroy()
         WelcomeApp()
 
+    def set_busy(self, busy):
+        self.status.config(text="Loading…" if busy else "")
+
     # ==================== ADMIN TABS (NO "Add Student" tab anymore) ====================
+    @traced("tab")
     def create_admin_tabs(self):
         self.tab_list = ttk.Frame(self.notebook)
         self.tab_grades = ttk.Frame(self.notebook)
+        self.tab_sheet = ttk.Frame(self.notebook)
+        self.tab_stats = ttk.Frame(self.notebook)
 
         self.notebook.add(self.tab_list, text="  All Students  ")
         self.notebook.add(self.tab_grades, text="  Update Grades  ")
-
-        self.show_all_students()
-        self.show_update_grades_tab()
-
+        self.notebook.add(self.tab_sheet, text="  Grade Sheet  ")
+        self.notebook.add(self.tab_stats, text="  Statistics  ")
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.on_tab_changed())
+
+        # roster tabs are built on first view, and rebound to a new roster only when viewed
+        self.roster_tabs = {str(self.tab_list): self.show_all_students,
+                            str(self.tab_grades): self.show_update_grades_tab,
+                            str(self.tab_sheet): self.show_grade_sheet}
+        self.bound = {}           # tab -> pager it is showing
+
+        subscribe(self.on_data_changed)
+        # queried once the window is up, so the first frame never waits on the database
+        self.root.after_idle(self.reload_roster)
+
+    def on_tab_changed(self):
+        self.show_current_tab()
+        self.refresh_stats()
+
+    def show_current_tab(self):
+        tab = self.notebook.select()
+        if tab in self.roster_tabs and hasattr(self, "pager") and self.bound.get(tab) is not self.pager:
+            self.roster_tabs[tab]()
+            self.bound[tab] = self.pager
+
+    def is_current(self, tab):
+        """Whether tab is built and showing the current roster, so changes should be patched in"""
+        return self.bound.get(str(tab)) is self.pager
+
+    def reload_roster(self):
+        # keyed, so a newer search supersedes one still running
+        self.executor.submit(self.load_roster, self.criteria, key="roster", on_done=self.show_roster)
+
+    @staticmethod
+    def load_roster(criteria):
+        pager = student_pager(CARD_COLUMNS, **criteria)
+        pager.count()
+        return pager
+
+    @traced("tab")
+    def show_roster(self, pager):
+        self.pager = pager
+        self.show_current_tab()
+        self.result_label.config(text=f"{pager.count()} students")
+
+    # ==================== SEARCH ====================
+    def create_search_bar(self):
+        self.criteria = {}
+        self._search_after = None
+
+        bar = tk.Frame(self.root, bg="#f1f5f9")
+        bar.pack(fill="x", padx=50, pady=(30, 0))
+
+        self.search_var = tk.StringVar()
+        self.filter_var = tk.StringVar(value="Any")
+        self.low_var = tk.StringVar()
+        self.high_var = tk.StringVar()
+
+        tk.Label(bar, text="Search:", font=("Helvetica", 18), bg="#f1f5f9").pack(side="left")
+        tk.Entry(bar, textvariable=self.search_var, font=("Helvetica", 18), width=28).pack(side="left", padx=10, ipady=6)
+        tk.Label(bar, text="Grade filter:", font=("Helvetica", 18), bg="#f1f5f9").pack(side="left", padx=(40, 10))
+        ttk.Combobox(bar, textvariable=self.filter_var, values=FILTER_CHOICES, state="readonly",
+                     font=("Helvetica", 16), width=9).pack(side="left")
+        tk.Entry(bar, textvariable=self.low_var, font=("Helvetica", 18), width=5, justify="center").pack(side="left", padx=10, ipady=6)
+        tk.Label(bar, text="to", font=("Helvetica", 18), bg="#f1f5f9").pack(side="left")
+        tk.Entry(bar, textvariable=self.high_var, font=("Helvetica", 18), width=5, justify="center").pack(side="left", padx=10, ipady=6)
+        self.result_label = tk.Label(bar, text="", font=("Helvetica", 16), bg="#f1f5f9", fg="#475569")
+        self.result_label.pack(side="right")
+
+        for var in (self.search_var, self.filter_var, self.low_var, self.high_var):
+            var.trace_add("write", lambda *args: self.schedule_search())
+
+    def schedule_search(self):
+        """Debounce: search once typing pauses instead of on every key"""
+        if self._search_after:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self._search_after = None
+
+        def number(text):
+            try:
+                return float(text)
+            except ValueError:
+                return None
+
+        criteria = {"text": self.search_var.get().strip()}
+        if self.filter_var.get() != "Any":
+            criteria.update(column=self.filter_var.get().lower(),
+                            low=number(self.low_var.get()), high=number(self.high_var.get()))
+        if criteria != self.criteria:
+            self.criteria = criteria
+            self.reload_roster()
+
+    def on_data_changed(self, event, table, key):
+        # may fire on a worker thread; hop to the Tk thread first
+        self.executor.call_soon(self.apply_change, event, table, key)
+
+    def apply_change(self, event, table, key):
+        """Patches only the affected card in the roster tabs already built after a write"""
+        if table != "students" or not hasattr(self, "pager"):
+            return
+        self.refresh_stats()
+        if event == "reload" or (event == "insert" and any(self.criteria.values())):
+            self.reload_roster()      # a filtered view has to re-check what matches
+        elif event == "insert":
+            self.pager.note_insert()
+            if self.is_current(self.tab_list):
+                self.list_view.append_rows()
+            if self.is_current(self.tab_grades):
+                self.grades_view.append_rows()
+            if self.is_current(self.tab_sheet):
+                self.grade_sheet.grow(self.pager.count())
+        else:
+            def patch(values):
+                if not values:
+                    return
+                if self.is_current(self.tab_list):
+                    self.list_view.update_row(key, values)
+                if self.is_current(self.tab_grades):
+                    self.grades_view.update_row(key, values)
+                if self.is_current(self.tab_sheet):
+                    self.grade_sheet.update_row(key, sheet_values(values))
+            self.executor.submit(self.pager.get, key, on_done=patch)
+
+    @traced("tab")
     def create_student_tab(self):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="  My Grades  ")
         self.show_student_grades(tab)
 
+    # ==================== BULK IMPORT ====================
+    def import_roster(self):
+        path = filedialog.askopenfilename(parent=self.root, title="Import roster",
+                                          filetypes=[("Rosters", "*.json *.jsonl *.csv"), ("All files", "*.*")])
+        if not path:
+            return
+
+        def progress(report):
+            self.executor.call_soon(self.status.config, {"text": f"Imported {report.read}…"})
+
+        def done(report):
+            details = "\n".join(report.errors[:5])
+            messagebox.showinfo("Import finished", f"{report}\n\n{details}".strip())
+        self.executor.submit(functools.partial(import_file, path, progress=progress), on_done=done)
+
+    # ==================== REPORT CARDS ====================
+    def write_reports(self):
+        out_dir = filedialog.askdirectory(parent=self.root, title="Folder for the report cards")
+        if not out_dir:
+            return
+
+        def progress(done, total):
+            self.executor.call_soon(self.status.config, {"text": f"Reports {done}/{total}…"})
+        self.executor.submit(functools.partial(generate_reports, out_dir, progress=progress),
+                             on_done=lambda count: messagebox.showinfo("Report cards",
+                                                                       f"Wrote {count} report cards to\n{out_dir}"))
+
     # ==================== POPUP: ADD STUDENT ====================
     def open_add_student_popup(self):
         popup = tk.Toplevel(self.root)
@@ -127,9 +304,8 @@ class StudentManagerApp:
 
         tk.Label(popup, text="ADD NEW STUDENT", font=("Helvetica", 40, "bold"), bg="white", fg="#1e293b").pack(pady=60)
 
-        # Auto ID
-        student_id = get_next_id()
-        tk.Label(popup, text=f"Student ID: {student_id}", font=("Helvetica", 28, "bold"), bg="white", fg="#00d4aa").pack(pady=20)
+        # Auto ID, taken from the sequence only when the student is saved
+        tk.Label(popup, text="Student ID: assigned on save", font=("Helvetica", 28, "bold"), bg="white", fg="#00d4aa").pack(pady=20)
 
         # Form fields
         labels = ["Name", "Surname", "Email (optional)", "English Grade", "History Grade", "Math Grade", "Science Grade", "Art Grade", "Password (for login)"]
@@ -149,96 +325,94 @@ class StudentManagerApp:
             pwd = entries["Password (for login)"].get().strip()
             if not name or not surname or not pwd:
                 return messagebox.showerror("Error", "Name, Surname, and Password are required!")
+            email = entries["Email (optional)"].get()
 
             try:
-                grades = [float(entries[f"{s} Grade"].get() or 0) for s in ["English","History","Math","Science","Art"]]
+                grades = [float(entries[f"{s} Grade"].get()) if entries[f"{s} Grade"].get().strip() else None
+                          for s in ["English","History","Math","Science","Art"]]
             except:
                 return messagebox.showerror("Error", "Grades must be numbers!")
 
-            # Save to DB
-            conn = sqlite3.connect(DB_NAME)
-            conn.execute('''INSERT INTO students 
-                (id, name, surname, email, english, history, math, science, art, added_date)
-                VALUES (?,?,?,?,?,?,?,?,?,?)''',
-                (student_id, name, surname, entries["Email (optional)"].get(),
-                 *grades, datetime.now().strftime("%Y-%m-%d")))
-            conn.commit()
-            conn.close()
-
-            conn = sqlite3.connect(USERS_DB)
-            conn.execute("INSERT INTO users VALUES (?,?, 'student')", (student_id, hash_pwd(pwd)))
-            conn.commit()
-            conn.close()
-
-            messagebox.showinfo("SUCCESS", f"Student added!\n\n{name} {surname}\nID: {student_id}\nPassword: {pwd}")
-            popup.destroy()
-            self.show_all_students()
-            self.show_update_grades_tab()
+            # Save to DB (the tabs pick the new row up from the insert event)
+            def write():
+                # id, student row and login go into one transaction
+                return add_student_account(None, name, surname, email, grades,
+                                           datetime.now().strftime("%Y-%m-%d"), hash_password(pwd))
+
+            def done(student_id):
+                messagebox.showinfo("SUCCESS", f"Student added!\n\n{name} {surname}\nID: {student_id}\nPassword: {pwd}")
+                popup.destroy()
+            self.executor.submit(write, on_done=done)
 
         tk.Button(popup, text="ADD STUDENT", font=("Helvetica", 26, "bold"), bg="#10b981", fg="white",
                   command=save_student, height=2, width=25).pack(pady=80)
 
     # ==================== ALL STUDENTS ====================
+    @traced("tab")
     def show_all_students(self):
-        for widget in self.tab_list.winfo_children():
-            widget.destroy()
-
-        canvas = tk.Canvas(self.tab_list)
-        scrollbar = ttk.Scrollbar(self.tab_list, command=canvas.yview)
-        scrollframe = ttk.Frame(canvas)
-        canvas.create_window((0,0), window=scrollframe, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        conn = sqlite3.connect(DB_NAME)
-        students = conn.execute("SELECT id, name, surname, english, history, math, science, art FROM students").fetchall()
-        conn.close()
-
-        for s in students:
-            sid, name, surname, e,h,m,sci,a = s
-            avg = sum(filter(None,[e,h,m,sci,a])) / len([x for x in [e,h,m,sci,a] if x]) if any([e,h,m,sci,a]) else 0
-            card = tk.Frame(scrollframe, bg="white", relief="solid", bd=2, pady=30, padx=60)
-            card.pack(fill="x", pady=18, padx=100)
-            tk.Label(card, text=f"{name} {surname}", font=("Helvetica", 28, "bold"), bg="white").pack(anchor="w")
-            tk.Label(card, text=f"ID: {sid} | Average: {avg:.1f}", font=("Helvetica", 20), bg="white", fg="#475569").pack(anchor="w")
-            tk.Label(card, text=f"Eng:{e} Hist:{h} Math:{m} Sci:{sci} Art:{a}", font=("Helvetica", 22), bg="white").pack(pady=10)
+        if not hasattr(self, "list_view"):
+            self.list_view = VirtualCardList(self.tab_list, self.build_student_card, self.fill_student_card,
+                                             pad_x=100, pad_y=18, executor=self.executor)
+        self.list_view.set_source(self.pager.count(), self.pager.fetch)
+
+    def build_student_card(self, parent):
+        card = tk.Frame(parent, bg="white", relief="solid", bd=2, pady=30, padx=60)
+        card.photo = tk.Label(card, bg="white")
+        card.photo.pack(side="right", anchor="n")
+        card.photo_path = None
+        card.title = tk.Label(card, font=("Helvetica", 28, "bold"), bg="white")
+        card.title.pack(anchor="w")
+        card.info = tk.Label(card, font=("Helvetica", 20), bg="white", fg="#475569")
+        card.info.pack(anchor="w")
+        card.grades = tk.Label(card, font=("Helvetica", 22), bg="white")
+        card.grades.pack(pady=10)
+        return card
+
+    def fill_student_card(self, card, key, row):
+        sid, name, surname, e,h,m,sci,a, avg, photo = row
+        card.title.config(text=f"{name} {surname}")
+        card.info.config(text=f"ID: {sid} | Average: {fmt_grade(avg)}")
+        card.grades.config(text="Eng:{} Hist:{} Math:{} Sci:{} Art:{}".format(*map(fmt_grade, (e,h,m,sci,a))))
+        if photo != card.photo_path:
+            card.photo_path = photo
+            card.photo.config(image="")
+            # the card may be recycled for another student before the thumbnail is ready
+            self.thumbs.request(photo, lambda image: card.photo_path == photo and card.photo.config(image=image))
 
     # ==================== UPDATE GRADES TAB ====================
+    @traced("tab")
     def show_update_grades_tab(self):
-        for widget in self.tab_grades.winfo_children():
-            widget.destroy()
-
-        tk.Label(self.tab_grades, text="UPDATE STUDENT GRADES", font=("Helvetica", 38, "bold")).pack(pady=50)
-
-        canvas = tk.Canvas(self.tab_grades)
-        scrollbar = ttk.Scrollbar(self.tab_grades, command=canvas.yview)
-        frame = ttk.Frame(canvas)
-        canvas.create_window((0,0), window=frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True, padx=80)
-        scrollbar.pack(side="right", fill="y")
-
-        conn = sqlite3.connect(DB_NAME)
-        students = conn.execute("SELECT id, name, surname, english, history, math, science, art FROM students").fetchall()
-        conn.close()
-
-        for s in students:
-            sid, name, surname, e,h,m,sci,a = s
-            avg = sum(filter(None,[e,h,m,sci,a])) / len([x for x in [e,h,m,sci,a] if x]) if any([e,h,m,sci,a]) else 0
-            card = tk.Frame(frame, bg="white", relief="solid", bd=2, pady=35, padx=70)
-            card.pack(fill="x", pady=20, padx=120)
-            tk.Label(card, text=f"{name} {surname}", font=("Helvetica", 28, "bold"), bg="white").pack(anchor="w")
-            tk.Label(card, text=f"ID: {sid} | Avg: {avg:.1f}", font=("Helvetica", 20), bg="white", fg="#475569").pack(anchor="w")
-            tk.Label(card, text=f"Eng:{e} Hist:{h} Math:{m} Sci:{sci} Art:{a}", font=("Helvetica", 22), bg="white").pack(pady=10)
-            tk.Button(card, text="UPDATE GRADES", font=("Helvetica", 18, "bold"), bg="#3b82f6", fg="white",
-                      command=lambda sid=sid: self.open_grade_editor(sid)).pack(pady=10)
+        if not hasattr(self, "grades_view"):
+            tk.Label(self.tab_grades, text="UPDATE STUDENT GRADES", font=("Helvetica", 38, "bold")).pack(pady=50)
+            self.grades_view = VirtualCardList(self.tab_grades, self.build_grade_card, self.fill_grade_card,
+                                               pad_x=120, pad_y=20, executor=self.executor, padx=80)
+        self.grades_view.set_source(self.pager.count(), self.pager.fetch)
+
+    def build_grade_card(self, parent):
+        card = tk.Frame(parent, bg="white", relief="solid", bd=2, pady=35, padx=70)
+        card.title = tk.Label(card, font=("Helvetica", 28, "bold"), bg="white")
+        card.title.pack(anchor="w")
+        card.info = tk.Label(card, font=("Helvetica", 20), bg="white", fg="#475569")
+        card.info.pack(anchor="w")
+        card.grades = tk.Label(card, font=("Helvetica", 22), bg="white")
+        card.grades.pack(pady=10)
+        card.sid = None
+        tk.Button(card, text="UPDATE GRADES", font=("Helvetica", 18, "bold"), bg="#3b82f6", fg="white",
+                  command=lambda: self.open_grade_editor(card.sid)).pack(pady=10)
+        return card
+
+    def fill_grade_card(self, card, key, row):
+        sid, name, surname, e,h,m,sci,a, avg, _photo = row
+        card.sid = sid
+        card.title.config(text=f"{name} {surname}")
+        card.info.config(text=f"ID: {sid} | Avg: {fmt_grade(avg)}")
+        card.grades.config(text="Eng:{} Hist:{} Math:{} Sci:{} Art:{}".format(*map(fmt_grade, (e,h,m,sci,a))))
 
     def open_grade_editor(self, sid):
+        self.executor.submit(get_student, sid, on_done=lambda data: self.build_grade_editor(sid, data))
+
+    def build_grade_editor(self, sid, data):
         # Same as before — grade editor popup
-        conn = sqlite3.connect(DB_NAME)
-        data = conn.execute("SELECT name, surname, english, history, math, science, art FROM students WHERE id=?", (sid,)).fetchone()
-        conn.close()
         name, surname, e,h,m,sci,a = data
 
         win = tk.Toplevel(self.root)
@@ -258,47 +432,153 @@ class StudentManagerApp:
             f.pack(pady=22)
             tk.Label(f, text=f"{subj}:", font=("Helvetica", 24), bg="white").pack(side="left", padx=40)
             ent = tk.Entry(f, font=("Helvetica", 30), width=8, justify="center")
-            ent.insert(0, val if val else "")
+            ent.insert(0, "" if val is None else val)
             ent.pack(side="right")
             entries[subj] = ent
 
         def save():
             try:
-                grades = [float(entries[s].get()) if entries[s].get().strip() else None for s in subjects]
-            except:
-                messagebox.showerror("Error", "Grades must be numbers!")
+                grades = [parse_grade(entries[s].get()) for s in subjects]
+            except ValueError:
+                messagebox.showerror("Error", "Grades must be numbers from 0 to 100!")
                 return
-            conn = sqlite3.connect(DB_NAME)
-            conn.execute("UPDATE students SET english=?, history=?, math=?, science=?, art=? WHERE id=?", (*grades, sid))
-            conn.commit()
-            conn.close()
-            messagebox.showinfo("Success", "Grades updated!")
-            win.destroy()
-            self.show_update_grades_tab()
-            self.show_all_students()
+            def done(_):
+                messagebox.showinfo("Success", "Grades updated!")
+                win.destroy()
+            self.executor.submit(update_grades, sid, grades, on_done=done)
 
         tk.Button(win, text="SAVE", font=("Helvetica", 26, "bold"), bg="#10b981", fg="white", command=save, height=2, width=20).pack(pady=80)
 
+    # ==================== GRADE SHEET ====================
+    @traced("tab")
+    def show_grade_sheet(self):
+        if not hasattr(self, "grade_sheet"):
+            bar = tk.Frame(self.tab_sheet)
+            bar.pack(fill="x", padx=40, pady=(20, 0))
+            tk.Button(bar, text="SAVE ALL", font=("Helvetica", 16, "bold"), bg="#10b981", fg="white",
+                      padx=30, pady=8, command=self.save_grade_sheet).pack(side="left")
+            tk.Button(bar, text="DISCARD", font=("Helvetica", 16, "bold"), bg="#ef4444", fg="white",
+                      padx=30, pady=8, command=lambda: self.grade_sheet.discard()).pack(side="left", padx=20)
+            self.sheet_status = tk.Label(bar, font=("Helvetica", 16), fg="#475569",
+                                         text="Type to edit • Enter/Tab/arrows move • Esc reverts • Ctrl+S saves")
+            self.sheet_status.pack(side="left", padx=20)
+            self.grade_sheet = EditableGrid(self.tab_sheet, SUBJECTS, parse_grade, executor=self.executor)
+            self.grade_sheet.on_edit = self.update_sheet_status
+            self.grade_sheet.entry.bind("<Control-s>", lambda e: self.save_grade_sheet() or "break")
+
+        pager = self.pager
+        self.grade_sheet.set_source(SHEET_COLUMNS, pager.count(),
+                                    lambda offset, limit: [(key, sheet_values(values))
+                                                           for key, values in pager.fetch(offset, limit)])
+
+    def update_sheet_status(self):
+        cells = sum(len(edits) for edits in self.grade_sheet.edits.values())
+        text = f"{cells} cells changed in {len(self.grade_sheet.edits)} students"
+        if self.grade_sheet.invalid:
+            text += f" • {len(self.grade_sheet.invalid)} invalid"
+        self.sheet_status.config(text=text)
+
+    def save_grade_sheet(self):
+        self.grade_sheet.commit()        # the cell being typed in counts too
+        changes, invalid = self.grade_sheet.pending()
+        if invalid:
+            return messagebox.showerror("Invalid grades",
+                                        f"{len(invalid)} cells need a number from 0 to 100, or blank.")
+        if not changes:
+            return
+        # edits typed while the save runs stay buffered
+        saved = self.grade_sheet.snapshot()
+
+        def done(count):
+            self.grade_sheet.discard(saved)
+            self.sheet_status.config(text=f"Saved grades for {count} students")
+        self.executor.submit(update_grades_many, changes, on_done=done)
+
+    # ==================== STATISTICS TAB ====================
+    def refresh_stats(self):
+        # only while the tab is showing; switching to it loads the latest
+        if self.notebook.select() == str(self.tab_stats):
+            self.executor.submit(class_summary, key="stats", on_done=self.show_stats)
+
+    @traced("tab")
+    def build_stats_tab(self):
+        tab = self.tab_stats
+        self.stats_title = tk.Label(tab, font=("Helvetica", 30, "bold"))
+        self.stats_title.pack(pady=(30, 10))
+
+        self.stats_table = ttk.Treeview(tab, columns=STAT_HEADINGS + [b[0] for b in BANDS],
+                                        show="tree headings", height=len(STAT_COLUMNS))
+        self.stats_table.heading("#0", text="Subject")
+        self.stats_table.column("#0", width=160)
+        for col in self.stats_table["columns"]:
+            self.stats_table.heading(col, text=col)
+            self.stats_table.column(col, width=90, anchor="center")
+        self.stats_table.pack(fill="x", padx=40, pady=10)
+
+        bottom = tk.Frame(tab)
+        bottom.pack(fill="both", expand=True, padx=40, pady=10)
+        self.stats_chart = tk.Canvas(bottom, bg="white", height=300, highlightthickness=0)
+        self.stats_chart.pack(side="left", fill="both", expand=True)
+        self.stats_top = tk.Label(bottom, font=("Helvetica", 16), justify="left", anchor="nw", bg="white", padx=30)
+        self.stats_top.pack(side="right", fill="y")
+
+    @traced("tab")
+    def show_stats(self, summary):
+        if not hasattr(self, "stats_table"):
+            self.build_stats_tab()
+        self.stats_title.config(text=f"CLASS STATISTICS — {summary['students']} students")
+
+        self.stats_table.delete(*self.stats_table.get_children())
+        for col, stats in summary["columns"].items():
+            values = [stats["count"]] + [fmt_grade(stats[k]) for k in ("mean", "median", "stdev", "min", "max")]
+            values += [fmt_grade(stats[f"p{p}"]) for p in PERCENTILES if p != 50] + stats["bands"]
+            self.stats_table.insert("", "end", text=col.title(), values=values)
+
+        # histogram of student averages over the colour bands
+        chart = self.stats_chart
+        chart.delete("all")
+        chart.update_idletasks()
+        width, height = max(chart.winfo_width(), 400), max(chart.winfo_height(), 300)
+        counts = summary["columns"]["average"]["bands"]
+        bar = width / (len(BANDS) * 1.5)
+        for i, ((label, _, color), count) in enumerate(zip(BANDS, counts)):
+            x = bar * 0.25 + i * bar * 1.5
+            top = height - 40 - (height - 80) * count / max(max(counts), 1)
+            chart.create_rectangle(x, top, x + bar, height - 40, fill=color, width=0)
+            chart.create_text(x + bar / 2, top - 12, text=str(count), font=("Helvetica", 14, "bold"))
+            chart.create_text(x + bar / 2, height - 20, text=label, font=("Helvetica", 14))
+
+        lines = [f"{rank}. {name} {surname} ({sid})  {avg:.1f}" for rank, sid, name, surname, avg in summary["top"]]
+        self.stats_top.config(text="TOP STUDENTS\n\n" + "\n".join(lines))
+
     # ==================== STUDENT VIEW ====================
+    @traced("tab")
     def show_student_grades(self, tab):
-        conn = sqlite3.connect(DB_NAME)
-        s = conn.execute("SELECT name, surname, english, history, math, science, art FROM students WHERE id=?", (self.username,)).fetchone()
-        conn.close()
+        # the profile came with the login; only the class rank is still to load
+        self.build_student_grades(tab, self.profile)
+        if self.profile:
+            self.executor.submit(student_rank, self.username, on_done=self.show_rank)
+
+    def show_rank(self, rank):
+        if rank:
+            self.rank_label.config(text=f"Class rank: {rank[0]} of {rank[1]}")
 
+    def build_student_grades(self, tab, s):
         if not s:
             tk.Label(tab, text="Not in class yet.\nAsk your teacher.", font=("Helvetica", 40), fg="red").pack(expand=True)
             return
 
         name, surname, e,h,m,sci,a = s
-        grades = [x for x in [e,h,m,sci,a] if x]
-        avg = sum(grades)/len(grades) if grades else 0
-        color = "#10b981" if avg >= 90 else "#3b82f6" if avg >= 80 else "#f59e0b" if avg >= 70 else "#ef4444"
+        avg = mean_grade([e,h,m,sci,a])
 
         f = tk.Frame(tab, bg="white")
         f.pack(fill="both", expand=True, padx=200, pady=150)
         tk.Label(f, text=f"{name} {surname}", font=("Helvetica", 44, "bold"), bg="white").pack(pady=80)
-        tk.Label(f, text=f"{avg:.1f}/100", font=("Helvetica", 120, "bold"), bg="white", fg=color).pack(pady=60)
-        tk.Label(f, text=f"English: {e} | History: {h} | Math: {m} | Science: {sci} | Art: {a}",
+        tk.Label(f, text=f"{fmt_grade(avg)}/100", font=("Helvetica", 120, "bold"), bg="white",
+                 fg=band_color(avg)).pack(pady=60)
+        self.rank_label = tk.Label(f, font=("Helvetica", 26), bg="white", fg="#475569")
+        self.rank_label.pack()
+        tk.Label(f, text="English: {} | History: {} | Math: {} | Science: {} | Art: {}".format(*map(fmt_grade, (e,h,m,sci,a))),
                  font=("Helvetica", 30), bg="white", fg="#475569").pack(pady=60)
 
 # ==================== LOGIN ====================
@@ -324,11 +604,19 @@ class WelcomeApp:
         self.pwd_entry = tk.Entry(card, font=("Helvetica", 26), show="*", justify="center")
         self.pwd_entry.pack(pady=15, ipady=20, fill="x")
 
-        tk.Button(card, text="LOGIN", bg="#00d4aa", fg="black", font=("Helvetica", 24, "bold"),
-                  width=20, height=2, command=self.login).pack(pady=100)
+        self.login_btn = tk.Button(card, text="LOGIN", bg="#00d4aa", fg="black", font=("Helvetica", 24, "bold"),
+                                   width=20, height=2, command=self.login)
+        self.login_btn.pack(pady=100)
+
+        self.executor = BackgroundExecutor(self.root, workers=1, on_busy=self.set_busy,
+                                           on_error=lambda e: messagebox.showerror("Database Error", str(e)))
 
         self.root.bind('<Return>', lambda e: self.login())
         self.root.mainloop()
+        self.executor.shutdown()
+
+    def set_busy(self, busy):
+        self.login_btn.config(text="CHECKING…" if busy else "LOGIN", state="disabled" if busy else "normal")
 
     def login(self):
         uid = self.id_entry.get().strip()
@@ -336,17 +624,24 @@ class WelcomeApp:
         if not uid or not pwd:
             return messagebox.showerror("Error", "Fill both fields")
 
-        conn = sqlite3.connect(USERS_DB)
-        user = conn.execute("SELECT role FROM users WHERE username=? AND password=?", (uid, hash_pwd(pwd))).fetchone()
-        conn.close()
+        # the KDF takes a while by design, so it runs on the executor too
+        self.executor.submit(login, uid, pwd, key="login",
+                             on_done=lambda account: self.logged_in(uid, account))
 
-        if user:
+    def logged_in(self, uid, account):
+        if account:
+            self.executor.shutdown()
             self.root.destroy()
-            StudentManagerApp(uid, user[0])
+            StudentManagerApp(uid, *account)
         else:
             messagebox.showerror("Failed", "Wrong ID or Password")
 
 # ==================== START ====================
 if __name__ == "__main__":
+    enable_from_env()
     init_databases()
-    WelcomeApp()
\ No newline at end of file
+    try:
+        WelcomeApp()
+    finally:
+        close_all()
+        TRACER.disable()
\ No newline at end of file
@@ -0,0 +1,18 @@
+# db_viewer/tests/conftest.py
+import os
+import sys
+
+# the modules import each other as top-level modules (python app.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def dbdir(tmp_path, monkeypatch):
+    """A working directory with fresh students.db / users.db"""
+    import database
+    monkeypatch.chdir(tmp_path)
+    database.init_databases()
+    yield tmp_path
+    database.close_all()
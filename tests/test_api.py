@@ -0,0 +1,49 @@
+# db_viewer/tests/test_api.py
+import json
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+
+from api import APIServer, Sessions
+from database import add_student_account
+from passwords import hash_password
+
+
+@pytest.fixture
+def server(dbdir):
+    server = APIServer(("127.0.0.1", 0), log_path=str(dbdir / "requests.jsonl"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def call(server, method, path, body=None, token=None):
+    conn = HTTPConnection(*server.server_address)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    result = response.status, json.loads(response.read())
+    conn.close()
+    return result
+
+
+def test_numeric_username_reads_its_own_record(server):
+    add_student_account("100", "Ann", "Test", None, [90.0] * 5, "2026-01-01", hash_password("pw", cost=2 ** 4))
+    status, session = call(server, "POST", "/login", {"username": 100, "password": "pw"})
+    assert status == 200
+
+    status, student = call(server, "GET", "/students/100", token=session["token"])
+    assert status == 200 and student["name"] == "Ann"
+
+
+def test_expired_tokens_are_dropped_on_create():
+    sessions = Sessions(ttl=0.01)
+    stale = sessions.create("S001", "student")
+    time.sleep(0.02)
+    fresh = sessions.create("S002", "student")
+
+    assert stale not in sessions._tokens and fresh in sessions._tokens
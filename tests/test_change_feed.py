@@ -0,0 +1,37 @@
+# db_viewer/tests/test_change_feed.py
+import sqlite3
+
+import pytest
+
+from database import ChangeFeed, add_student_account, update_grades, DB_STUDENTS
+
+GRADES = [80.0, 70.0, 60.0, 50.0, 40.0]
+
+
+def add(name):
+    return add_student_account(None, name, "Test", None, GRADES, "2026-01-01", "hash")
+
+
+def test_numbers_are_not_reused_after_the_newest_row_is_deleted(dbdir):
+    for name in ("Ann", "Ben", "Cy"):
+        add(name)
+    feed = ChangeFeed(DB_STUDENTS)
+
+    update_grades("S003", [90.0] * 5)             # S003 now has the highest change_seq
+    other = sqlite3.connect(DB_STUDENTS)
+    with other:
+        other.execute("DELETE FROM students WHERE id='S003'")
+    other.close()
+    new = add("Dee")
+
+    count, rows, deleted = feed.poll()
+    assert count == 3 and deleted == 1
+    assert [values[0] for _, values in rows] == [new]
+    assert feed.poll() is None
+
+
+def test_missing_database_is_not_created(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError, match="users.db not found"):
+        ChangeFeed("users.db")
+    assert list(tmp_path.iterdir()) == []
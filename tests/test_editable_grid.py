@@ -0,0 +1,122 @@
+# db_viewer/tests/test_editable_grid.py
+from widgets import EditableGrid
+
+COLUMNS = ["id", "name", "english", "history"]
+ROWS = [("S001", ("S001", "Ann", 80.0, 70.0)), ("S002", ("S002", "Ben", 60.0, None))]
+
+
+class StubEntry:
+    def __init__(self):
+        self.text = ""
+
+    def get(self):
+        return self.text
+
+    def delete(self, first, last):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text = str(text)
+
+    def select_range(self, first, last):
+        pass
+
+    def place(self, **kwargs):
+        pass
+
+    def place_forget(self):
+        pass
+
+    def focus_set(self):
+        pass
+
+
+class StubView:
+    """PagedTreeview without Tk: every row is on screen, item values are strings like Tk's"""
+
+    def __init__(self):
+        self.total = self.top = 0
+        self.visible = 10
+        self.on_render = None
+        self.keys = {}            # slot -> key
+        self.shown = {}           # slot -> values as displayed
+
+    def set_source(self, columns, total, fetch, sort=None, prepare=None):
+        rows = fetch(0, total)
+        self.total = total
+        self._show(prepare(rows) if prepare else rows)
+
+    def _show(self, rows):
+        for i, (key, values) in enumerate(rows):
+            self.keys[f"I{i}"] = key
+            self.shown[f"I{i}"] = tuple(str(v) for v in values)
+        self.on_render()
+
+    def update_rows(self, total, changed):
+        for slot, key in self.keys.items():
+            if key in changed:
+                self.shown[slot] = tuple(str(v) for v in changed[key])
+        self.on_render()
+
+    def reload(self, total):
+        self.on_render()
+
+    def row_at(self, index):
+        slot = f"I{index}"
+        return (slot, self.keys[slot]) if slot in self.keys else None
+
+    def scroll_to(self, top):
+        pass
+
+
+class StubTree:
+    def __init__(self, view):
+        self.view = view
+
+    def bbox(self, slot, column):
+        return 0, 0, 100, 30
+
+    def item(self, slot, option):
+        return self.view.shown[slot]
+
+
+def parse(text):
+    return float(text) if text.strip() else None
+
+
+def make_grid():
+    grid = EditableGrid.__new__(EditableGrid)       # no Tk: the view, tree and entry are stubs
+    grid.editable, grid.parse, grid.columns = ["english", "history"], parse, []
+    grid.edits, grid.invalid, grid._originals = {}, set(), {}
+    grid.on_edit = None
+    grid.row = grid.col = 0
+    grid._cell = None
+    grid.view = StubView()
+    grid.view.on_render = grid._place
+    grid.tree = StubTree(grid.view)
+    grid.entry = StubEntry()
+    grid.set_source(COLUMNS, len(ROWS), lambda offset, limit: ROWS[offset:offset + limit])
+    return grid
+
+
+def test_loading_and_moving_store_nothing():
+    grid = make_grid()
+    assert grid.entry.text == "80.0" and grid.pending() == ({}, [])
+
+    grid.move(0, 1)          # Tab
+    grid.move(1, 0)          # Down
+    assert grid._cell == ("S002", "history") and grid.entry.text == ""
+    assert grid.pending() == ({}, [])
+
+
+def test_typed_text_stays_on_its_own_cell():
+    grid = make_grid()
+    grid.entry.text = "95"
+    grid.move(0, 1)          # Tab to history
+    assert grid.entry.text == "70.0"
+    grid.move(1, 0)          # Down to S002's history
+    assert grid.pending() == ({"S001": {"english": 95.0}}, [])
+
+    grid.entry.text = "40"
+    grid.commit()            # what a save does before reading pending()
+    assert grid.pending() == ({"S001": {"english": 95.0}, "S002": {"history": 40.0}}, [])
@@ -0,0 +1,84 @@
+# db_viewer/tests/test_executor.py
+import functools
+import time
+
+from executor import BackgroundExecutor
+
+
+class StubRoot:
+    """Just enough of tk.Tk for the executor: after() callbacks run when pumped"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.reported = []
+        self._next = 0
+
+    def after(self, ms, fn):
+        self._next += 1
+        self.scheduled[self._next] = fn
+        return self._next
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.reported.append(exc)
+
+    def pump(self, until, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "timed out waiting for the executor"
+            scheduled, self.scheduled = self.scheduled, {}
+            for fn in scheduled.values():
+                fn()
+            time.sleep(0.005)
+
+
+def make_executor(**kwargs):
+    root = StubRoot()
+    busy = []
+    executor = BackgroundExecutor(root, on_busy=busy.append, **kwargs)
+    return root, executor, busy
+
+
+def test_raising_callback_keeps_polling():
+    root, executor, busy = make_executor()
+    results = []
+
+    def explode(result):
+        raise TypeError("cannot unpack non-iterable NoneType object")
+
+    executor.submit(lambda: None, on_done=explode)
+    executor.submit(lambda: 42, on_done=results.append)
+    root.pump(lambda: results)
+
+    assert results == [42]
+    assert [type(e) for e in root.reported] == [TypeError]
+    assert executor._pending == 0 and busy[-1] is False
+    executor.shutdown()
+
+
+def test_raising_callback_goes_to_on_error():
+    errors = []
+    root, executor, busy = make_executor(on_error=errors.append)
+    executor.submit(lambda: 1, on_done=lambda result: 1 / 0)
+    root.pump(lambda: errors)
+
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert root.reported == [] and busy[-1] is False
+    executor.shutdown()
+
+
+def test_keyword_arguments_through_partial():
+    # submit() keeps its own keywords (on_done, key, busy); job keywords go in a partial
+    def job(path, progress=None):
+        progress(path)
+        return path.upper()
+
+    root, executor, busy = make_executor()
+    seen, results = [], []
+    executor.submit(functools.partial(job, "roster.json", progress=seen.append), on_done=results.append)
+    root.pump(lambda: results)
+
+    assert seen == ["roster.json"] and results == ["ROSTER.JSON"]
+    executor.shutdown()
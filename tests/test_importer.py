@@ -0,0 +1,45 @@
+# db_viewer/tests/test_importer.py
+import json
+
+from database import connection, allocate_student_ids, DB_STUDENTS, DB_USERS
+from importer import import_file
+
+
+def write_roster(path, records):
+    path.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+    return str(path)
+
+
+def students():
+    with connection(DB_STUDENTS) as conn:
+        return dict(conn.execute("SELECT id, name FROM students"))
+
+
+def test_explicit_id_later_in_the_batch_wins(dbdir):
+    roster = write_roster(dbdir / "roster.jsonl", [{"name": "Ann"}, {"name": "Ben"}, {"id": "S002", "name": "Cy"}])
+    report = import_file(roster)
+
+    assert (report.written, report.duplicates) == (3, 0)
+    assert students() == {"S002": "Cy", "S003": "Ann", "S004": "Ben"}
+    assert allocate_student_ids() == ["S005"]
+
+
+def test_explicit_id_in_a_later_batch_renumbers_the_earlier_record(dbdir):
+    roster = write_roster(dbdir / "roster.jsonl",
+                          [{"name": "Ann"}, {"name": "Ben"}, {"id": "S002", "name": "Cy", "password": "pw"}])
+    report = import_file(roster, batch_size=1, default_password="pw", kdf_cost=2 ** 4)
+
+    assert (report.written, report.duplicates, report.users) == (3, 0, 3)
+    assert students() == {"S001": "Ann", "S002": "Cy", "S003": "Ben"}
+    with connection(DB_USERS) as conn:
+        assert sorted(u for (u,) in conn.execute("SELECT username FROM users WHERE role='student'")) == \
+            ["S001", "S002", "S003"]
+    assert allocate_student_ids() == ["S004"]
+
+
+def test_repeated_explicit_id_is_a_duplicate(dbdir):
+    roster = write_roster(dbdir / "roster.jsonl", [{"id": "S007", "name": "Ann"}, {"id": "S007", "name": "Ben"}])
+    report = import_file(roster)
+
+    assert (report.written, report.duplicates) == (1, 1)
+    assert students() == {"S007": "Ann"}
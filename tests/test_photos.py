@@ -0,0 +1,38 @@
+# db_viewer/tests/test_photos.py
+import os
+from types import SimpleNamespace
+
+from photos import ThumbnailCache, ThumbnailStore
+
+
+class StubRoot:
+    def __init__(self):
+        self.idle = []
+
+    def after_idle(self, fn):
+        self.idle.append(fn)
+
+
+def test_tk_decodes_are_queued_one_idle_tick_at_a_time(tmp_path):
+    root = StubRoot()
+    cache = ThumbnailCache(SimpleNamespace(root=root), store=ThumbnailStore(str(tmp_path)))
+    for name in ("a.png", "b.gif", "c.jpg", "d.png"):
+        cache._waiting[name] = []
+        cache._loaded(name, str(tmp_path / f"{name}.thumb.png"), False)
+
+    assert [path for path, _ in cache._to_shrink] == ["a.png", "b.gif", "d.png"]
+    assert root.idle == [cache._shrink_next]          # the next decode is scheduled by this one
+    assert cache._failed == {"c.jpg"}                 # Tk can't read JPEG: no photo without Pillow
+
+
+def test_store_prunes_least_recently_used(tmp_path):
+    store = ThumbnailStore(str(tmp_path), limit=250)
+    paths = []
+    for i in range(3):
+        thumb = str(tmp_path / f"{i}.png")
+        store.save(thumb, lambda tmp: open(tmp, "wb").write(b"x" * 100))
+        os.utime(thumb, (1000 + i, 1000 + i))        # oldest first, whatever the clock resolution
+        store.add(thumb)
+        paths.append(thumb)
+
+    assert [p for p in paths if (tmp_path / p).exists()] == paths[1:]
@@ -0,0 +1,28 @@
+# db_viewer/tests/test_read_cache.py
+from database import ReadCache, DB_STUDENTS
+
+
+def page(n):
+    return tuple((i, f"row {i}") for i in range(n))
+
+
+def test_bounded_by_rows_not_entries(dbdir):
+    cache = ReadCache(str(dbdir / DB_STUDENTS), max_rows=25)
+    for offset in range(5):
+        cache.get(("page", offset), lambda: page(10), rows=len)
+
+    stats = cache.stats()
+    assert (stats["size"], stats["rows"], stats["evictions"]) == (2, 20, 3)
+    cache.close()
+
+
+def test_result_larger_than_the_cache_is_not_kept(dbdir):
+    cache = ReadCache(str(dbdir / DB_STUDENTS), max_rows=25)
+    cache.get("small", lambda: 1)
+    assert cache.get("huge", lambda: page(30), rows=len) == page(30)
+
+    loads = []
+    cache.get("huge", lambda: loads.append(1) or page(30), rows=len)
+    assert loads == [1]
+    assert cache.stats()["rows"] == 1 and cache.get("small", lambda: 2) == 1
+    cache.close()
@@ -0,0 +1,33 @@
+# db_viewer/tests/test_reports.py
+from analytics import band_color, band_label, fmt_grade, NO_GRADE_COLOR
+from database import add_student_account
+from reports import generate_reports
+
+
+def test_band_helpers():
+    assert [band_label(g) for g in (95, 90, 85.5, 70, 12, None)] == ["90+", "90+", "80-89", "70-79", "<70", "—"]
+    assert band_color(None) == NO_GRADE_COLOR and fmt_grade(None) == "—" and fmt_grade(81.25) == "81.2"
+
+
+def test_cards_and_summary(dbdir):
+    add_student_account(None, "Ann", "Test", None, [95.0, 85.0, None, 70.0, 10.0], "2026-01-01", "hash")
+    add_student_account(None, "Ben", "Test", None, [None] * 5, "2026-01-01", "hash")
+    out = dbdir / "reports"
+
+    assert generate_reports(str(out), term="Spring", workers=1) == 2
+    assert sorted(p.name for p in out.iterdir()) == ["S001.html", "S001.txt", "S002.html", "S002.txt",
+                                                     "class_summary.html", "class_summary.txt"]
+    card = (out / "S001.txt").read_text(encoding="utf-8")
+    assert "Class rank: 1 of 1" in card and "History      85.0  80-89" in card and "Math            —  —" in card
+    assert "Not ranked" in (out / "S002.html").read_text(encoding="utf-8")
+
+
+def test_worker_processes_write_every_card(dbdir):
+    for name in ("Ann", "Ben", "Cy", "Dee", "Eve"):
+        add_student_account(None, name, "Test", None, [80.0] * 5, "2026-01-01", "hash")
+    out = dbdir / "reports"
+    done = []
+
+    assert generate_reports(str(out), formats=["txt"], workers=2, chunk_size=1,
+                            progress=lambda n, total: done.append(n)) == 5
+    assert done[-1] == 5 and len(list(out.glob("S*.txt"))) == 5
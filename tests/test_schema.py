@@ -0,0 +1,39 @@
+# db_viewer/tests/test_schema.py
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import database
+
+LEGACY_DB = Path(__file__).resolve().parent.parent / "students.db"     # the old english_grade layout
+
+
+def schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0], sorted(
+            name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'"))
+    finally:
+        conn.close()
+
+
+def test_unsupported_layout_is_left_untouched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(LEGACY_DB, database.DB_STUDENTS)
+    before = schema(database.DB_STUDENTS)
+    try:
+        with pytest.raises(sqlite3.DatabaseError, match="students.db has a students table .* \\(missing surname"):
+            database.init_databases()
+        assert schema(database.DB_STUDENTS) == before
+        assert "photo" not in [row[1] for row in sqlite3.connect(database.DB_STUDENTS).execute(
+            "PRAGMA table_info(students)")]
+    finally:
+        database.close_all()
+
+
+def test_new_files_are_current(dbdir):
+    version, tables = schema(database.DB_STUDENTS)
+    assert version == database.SCHEMA_VERSION
+    assert {"students", "id_sequence", "change_sequence", "students_fts"} <= set(tables)
@@ -0,0 +1,264 @@
+# db_viewer/tracing.py
+"""Opt-in latency tracing for SQL, password hashing and Tk work.
+
+    STUDENT_TRACE=trace.jsonl python studenttracker.py
+
+Every timed operation is added to a rolling histogram per (kind, name)
+and written to the trace file as one JSON line; the file ends with a
+summary line of every histogram. Disabled (the default), each hook costs
+one attribute check, and connections are plain sqlite3 connections.
+"""
+import functools
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_ENV = "STUDENT_TRACE"
+WINDOW = 1000            # most recent samples each histogram keeps
+SQL_NAME_CHARS = 160
+
+
+class JsonLinesLog:
+    """Appends one JSON line per entry from a writer thread, so callers
+    never wait on the file"""
+
+    def __init__(self, path):
+        self._queue = queue.Queue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._write, name="jsonl-log", daemon=True)
+        self._thread.start()
+
+    def log(self, entry):
+        self._queue.put(entry)
+
+    def _write(self):
+        while True:
+            entries = [self._queue.get()]
+            while not self._queue.empty():
+                entries.append(self._queue.get_nowait())
+            stop = None in entries
+            self._file.write("".join(json.dumps(e) + "\n" for e in entries if e is not None))
+            self._file.flush()
+            if stop:
+                return
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+
+# ==================== HISTOGRAMS ====================
+class Histogram:
+    """Latencies (ms) of the last `window` calls, plus all-time totals"""
+
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+        self.total += ms
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 3)
+        return {"count": self.count, "total_ms": round(self.total, 3), "recent_ms": round(sum(ordered), 3),
+                "p50": pct(50), "p95": pct(95), "p99": pct(99), "max": round(ordered[-1], 3)}
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._log = None
+
+    def enable(self, path=None):
+        """Starts collecting; with a path, every sample is also written there"""
+        if self.enabled:
+            return
+        self.path = path
+        self._log = JsonLinesLog(path) if path else None
+        self.enabled = True
+
+    def disable(self):
+        """Stops collecting and closes the trace file after a summary line"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._log:
+            self._log.log({"ts": time.time(), "summary": [dict(kind=k, name=n, **s)
+                                                         for (k, n), s in self.snapshot().items()]})
+            self._log.close()
+            self._log = None
+
+    def record(self, kind, name, ms, **fields):
+        with self._lock:
+            histogram = self._histograms.get((kind, name))
+            if histogram is None:
+                histogram = self._histograms[kind, name] = Histogram()
+            histogram.add(ms)
+        if self._log:
+            self._log.log({"ts": time.time(), "kind": kind, "name": name, "ms": round(ms, 3),
+                           "thread": threading.current_thread().name, **fields})
+
+    def snapshot(self):
+        with self._lock:
+            return {key: h.summary() for key, h in self._histograms.items()}
+
+    def hot_spots(self, limit=10):
+        """[((kind, name), summary)] with the most time spent over their recent samples"""
+        return sorted(self.snapshot().items(), key=lambda item: item[1]["recent_ms"], reverse=True)[:limit]
+
+
+TRACER = Tracer()
+
+
+def enable_from_env():
+    """Turns tracing on when $STUDENT_TRACE names a trace file"""
+    path = os.environ.get(TRACE_ENV)
+    if path:
+        TRACER.enable(path)
+    return TRACER.enabled
+
+
+@contextmanager
+def span(kind, name, **fields):
+    if not TRACER.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        TRACER.record(kind, name, (time.perf_counter() - start) * 1000, **fields)
+
+
+def traced(kind, name=None):
+    """Decorator: records every call under (kind, name or the function's qualified name)"""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                TRACER.record(kind, label, (time.perf_counter() - start) * 1000)
+        return call
+    return wrap
+
+
+# ==================== SQL ====================
+def _sql_name(sql):
+    return re.sub(r"\s+", " ", sql).strip()[:SQL_NAME_CHARS]
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Times a statement from execute until its rows are exhausted (or the
+    cursor is dropped) and records it with the number of rows read, or the
+    rowcount for statements that return none"""
+
+    _pending = None          # [sql, seconds so far, rows read]
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = [sql, time.perf_counter() - start, 0]
+        if self.description is None:
+            self._finish(self.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._pending = [sql, time.perf_counter() - start, 0]
+        self._finish(self.rowcount)
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+    def _fetched(self, start, rows, done):
+        pending = self._pending
+        if pending:
+            pending[1] += time.perf_counter() - start
+            pending[2] += rows
+            if done:
+                self._finish()
+
+    def _finish(self, rows=None):
+        pending, self._pending = self._pending, None
+        if pending and TRACER.enabled:
+            sql, seconds, read = pending
+            TRACER.record("sql", _sql_name(sql), seconds * 1000, rows=read if rows is None else rows)
+
+
+class TracedConnection(sqlite3.Connection):
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        with span("sql", "executescript"):
+            return super().executescript(script)
+
+
+def connection_factory():
+    """The sqlite3.connect factory for new connections: traced while tracing is on"""
+    return TracedConnection if TRACER.enabled else sqlite3.Connection
@@ -1,5 +1,12 @@
 # db_viewer/widgets.py
+import tkinter as tk
 from tkinter import ttk
+from collections import OrderedDict
+
+try:
+    from .tracing import traced, TRACER
+except ImportError:
+    from tracing import traced, TRACER
 
 def setup_treeview(parent):
     """Creates and returns a styled Treeview with scrollbar"""
@@ -17,4 +24,700 @@ def setup_treeview(parent):
     style.configure("Treeview", font=("Helvetica", 12), rowheight=35)
     style.configure("Treeview.Heading", font=("Helvetica", 14, "bold"), background="#0f172a", foreground="white")
 
-    return tree
\ No newline at end of file
+    return tree
+
+class PagedTreeview:
+    """Treeview that only holds the visible window of a large result set.
+
+    Rows come from fetch(offset, limit) -> [(key, values), ...]; a prefetch
+    margin above and below the window keeps scrolling from hitting the
+    database on every step. With an executor, fetches run off the UI thread.
+    """
+
+    def __init__(self, parent, margin=100, col_width=160, executor=None, on_heading=None, row_tags=None):
+        self.margin = margin
+        self.col_width = col_width
+        self.executor = executor
+        self.on_heading = on_heading    # on_heading(column) when a heading is clicked
+        self.row_tags = row_tags        # row_tags(key) -> Treeview tags for a loaded row
+        self.on_render = None           # on_render() after every redraw of the window
+
+        frame = ttk.Frame(parent)
+        frame.pack(fill="both", expand=True, padx=40, pady=20)
+
+        self.tree = ttk.Treeview(frame, show="headings", height=22, selectmode="browse")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        style = ttk.Style()
+        style.configure("Treeview", font=("Helvetica", 12), rowheight=35)
+        style.configure("Treeview.Heading", font=("Helvetica", 14, "bold"), background="#0f172a", foreground="white")
+
+        self.fetch = None
+        self.prepare = None
+        self.total = 0
+        self.top = 0
+        self.visible = 22
+        self.selected_key = None
+        self._slots = []          # item ids reused for every window
+        self._keys = {}           # slot id -> row key currently shown
+        self._shown = {}          # slot id -> values currently shown
+        self._stale = False       # buffer still showing, but due for a refetch
+        self._buf_start = 0
+        self._buffer = []
+        self._inflight = None     # (start, end) of the window being fetched
+        self._gen = 0
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible) or "break")
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self.scroll_to(self.total) or "break")
+        self.tree.bind("<Up>", self._on_arrow)
+        self.tree.bind("<Down>", self._on_arrow)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    # ---------- data source ----------
+    def set_source(self, columns, total, fetch, sort=None, prepare=None):
+        """Shows a new result set from the top; sort=(column, descending) marks a heading.
+        prepare(rows) -> rows runs on the Tk thread on every fetched window."""
+        self.tree["columns"] = columns
+        for col in columns:
+            arrow = "" if not sort or sort[0] != col else " ▼" if sort[1] else " ▲"
+            command = (lambda c=col: self.on_heading(c)) if self.on_heading else ""
+            self.tree.heading(col, text=col.title() + arrow, command=command)
+            self.tree.column(col, width=self.col_width, anchor="center")
+        self.fetch = fetch
+        self.prepare = prepare
+        self.total = total
+        self.top = 0
+        self.selected_key = None
+        self._buffer = []
+        self._shown = {}
+        self._inflight = None
+        self._gen += 1
+        self._render()
+
+    def update_rows(self, total, changed):
+        """Live update for a source whose rows don't move: loaded rows whose key
+        is in changed ({key: values}) are patched and the total follows the table"""
+        self._buffer = [(key, changed.get(key, values)) for key, values in self._buffer]
+        self.total = total
+        self.top = max(0, min(self.top, total - self.visible))
+        self._render()
+
+    def reload(self, total):
+        """Refetches the window in place, e.g. after writes to a sorted or filtered
+        source; rows keep showing until the new ones land, then only changed ones redraw"""
+        self.total = total
+        self.top = max(0, min(self.top, total - self.visible))
+        self._stale = True
+        self._inflight = None
+        self._gen += 1
+        self._render()
+
+    def row_at(self, index):
+        """(item id, key) of the item showing row index, or None when it's off screen"""
+        i = index - self.top
+        if 0 <= i < len(self._slots):
+            slot = self._slots[i]
+            return slot, self._keys.get(slot)
+        return None
+
+    def index_of(self, item):
+        return self.top + self._slots.index(item) if item in self._slots else None
+
+    def selected(self):
+        """(key, values) of the selected row, or None"""
+        sel = self.tree.selection()
+        if not sel or sel[0] not in self._keys:
+            return None
+        return self._keys[sel[0]], self.tree.item(sel[0], "values")
+
+    # ---------- scrolling ----------
+    def scroll(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), self.total - self.visible))
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.total)
+        elif unit == "pages":
+            self.scroll(int(amount) * self.visible)
+        else:
+            self.scroll(int(amount))
+
+    def _on_arrow(self, event):
+        focus = self.tree.focus()
+        if not self._slots or focus not in self._slots:
+            return None
+        index = self._slots.index(focus)
+        step = -1 if event.keysym == "Up" else 1
+        shown = min(self.visible, self.total - self.top)
+        if 0 <= index + step < shown:
+            return None           # the Treeview moves the selection itself
+        self.scroll(step)
+        self.tree.selection_set(focus)
+        return "break"
+
+    def _on_select(self, _event):
+        sel = self.tree.selection()
+        if sel and sel[0] in self._keys:
+            self.selected_key = self._keys[sel[0]]
+
+    def _on_resize(self, _event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 35)
+        visible = max(1, self.tree.winfo_height() // rowheight - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    # ---------- rendering ----------
+    def _window(self):
+        end = min(self.top + self.visible, self.total)
+        buf_end = self._buf_start + len(self._buffer)
+        if self.fetch and (self._stale or self.top < self._buf_start or end > buf_end):
+            start, limit = max(0, self.top - self.margin), self.visible + 2 * self.margin
+            if self.executor is None:
+                rows = self.fetch(start, limit)
+                self._buf_start, self._buffer = start, self.prepare(rows) if self.prepare else rows
+                self._stale = False
+                buf_end = start + len(self._buffer)
+            elif not (self._inflight and self._inflight[0] <= self.top and end <= self._inflight[1]):
+                self._inflight = (start, start + limit)
+                self.executor.submit(self.fetch, start, limit, key=("window", id(self)),
+                                     on_done=lambda rows, gen=self._gen: self._loaded(gen, start, rows))
+        # rows not loaded yet render blank until their fetch lands
+        return [self._buffer[i - self._buf_start] if self._buf_start <= i < buf_end else (None, ())
+                for i in range(self.top, end)]
+
+    def _loaded(self, gen, start, rows):
+        if gen != self._gen:
+            return
+        self._inflight = None
+        self._stale = False
+        self._buf_start, self._buffer = start, self.prepare(rows) if self.prepare else rows
+        self._render()
+
+    @traced("tk")
+    def _render(self):
+        rows = self._window()
+        while len(self._slots) < len(rows):
+            self._slots.append(self.tree.insert("", "end"))
+        while len(self._slots) > len(rows):
+            slot = self._slots.pop()
+            self._shown.pop(slot, None)
+            self.tree.delete(slot)
+
+        self._keys = {}
+        selected_slot = None
+        for slot, (key, values) in zip(self._slots, rows):
+            shown = (values, self.row_tags(key) if self.row_tags and key is not None else ())
+            if self._shown.get(slot) != shown:        # leave unchanged items alone
+                self.tree.item(slot, values=values, tags=shown[1])
+                self._shown[slot] = shown
+            self._keys[slot] = key
+            if key is not None and key == self.selected_key:
+                selected_slot = slot
+        if selected_slot:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if self.total:
+            first = self.top / self.total
+            self.scrollbar.set(first, min(1.0, (self.top + len(rows)) / self.total))
+        else:
+            self.scrollbar.set(0, 1)
+        if self.on_render:
+            self.on_render()
+
+
+class EditableGrid:
+    """Spreadsheet-style editor over a PagedTreeview.
+
+    An entry box sits on the active cell: type to edit, Return/Tab/arrows move,
+    Escape reverts the cell. Edits stay in a client-side buffer until the
+    caller saves them; parse(text) -> value validates a cell and raises
+    ValueError for text that can't be stored.
+    """
+
+    def __init__(self, parent, editable, parse, executor=None, col_width=130):
+        self.editable = list(editable)
+        self.parse = parse
+        self.columns = []
+        self.edits = {}           # key -> {column: text}
+        self.invalid = set()      # (key, column) whose text doesn't parse
+        self.on_edit = None       # on_edit() whenever the buffer changes
+        self._originals = {}      # key -> values as loaded, for edited rows
+        self.row = 0              # active cell: row index and position in editable
+        self.col = 0
+        self._cell = None         # (key, column) the entry box is showing
+
+        self.view = PagedTreeview(parent, col_width=col_width, executor=executor, row_tags=self._tags)
+        self.view.on_render = self._place
+        self.tree = self.view.tree
+        self.tree.tag_configure("edited", background="#fef9c3")
+        self.tree.tag_configure("invalid", background="#fecaca")
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Map>", lambda e: self._place())
+
+        self.entry = tk.Entry(self.tree, font=("Helvetica", 12), justify="center", relief="solid", bd=2)
+        for keys, move in (("<Return>", (1, 0)), ("<Down>", (1, 0)), ("<Up>", (-1, 0)),
+                           ("<Tab>", (0, 1)), ("<Shift-Tab>", (0, -1)), ("<ISO_Left_Tab>", (0, -1))):
+            self.entry.bind(keys, lambda e, m=move: self.move(*m) or "break")
+        self.entry.bind("<Prior>", lambda e: self.move(-self.view.visible, 0) or "break")
+        self.entry.bind("<Next>", lambda e: self.move(self.view.visible, 0) or "break")
+        self.entry.bind("<Escape>", lambda e: self.revert() or "break")
+        for wheel in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.entry.bind(wheel, lambda e: self.tree.event_generate(
+                "<Button-4>" if getattr(e, "num", 0) == 4 or getattr(e, "delta", 0) > 0 else "<Button-5>"))
+
+    # ---------- data ----------
+    def set_source(self, columns, total, fetch):
+        self.commit()                # keep what's typed in the entry box
+        self._cell = None
+        self.columns = list(columns)
+        self.row = min(self.row, max(total - 1, 0))
+        self.view.set_source(columns, total, fetch, prepare=self._with_edits)
+
+    def _display(self, key, values):
+        values = tuple("" if v is None else v for v in values)
+        edits = self.edits.get(key)
+        if not edits:
+            return values
+        values = list(values)
+        for column, text in edits.items():
+            values[self.columns.index(column)] = text
+        return tuple(values)
+
+    def _with_edits(self, rows):
+        # on the Tk thread, like every other change to the buffer and originals
+        for key, values in rows:
+            if key in self._originals:
+                self._originals[key] = tuple("" if v is None else v for v in values)
+        return [(key, self._display(key, values)) for key, values in rows]
+
+    def update_row(self, key, values):
+        """New stored values for a row; its pending edits stay on top"""
+        if key in self._originals:
+            self._originals[key] = tuple("" if v is None else v for v in values)
+        self.view.update_rows(self.view.total, {key: self._display(key, values)})
+
+    def grow(self, total):
+        self.view.update_rows(total, {})
+
+    def _tags(self, key):
+        if any(k == key for k, _ in self.invalid):
+            return ("invalid",)
+        return ("edited",) if key in self.edits else ()
+
+    # ---------- edit buffer ----------
+    def pending(self):
+        """({key: {column: value}}, [(key, column), ...] that don't parse)"""
+        changes, invalid = {}, []
+        for key, edits in self.edits.items():
+            for column, text in edits.items():
+                try:
+                    changes.setdefault(key, {})[column] = self.parse(text)
+                except ValueError:
+                    invalid.append((key, column))
+        return changes, invalid
+
+    def commit(self):
+        """Moves the text in the entry box into the edit buffer, e.g. before a save"""
+        if self._cell is not None:
+            self._store(self._cell, self.entry.get())
+
+    def snapshot(self):
+        return {key: dict(edits) for key, edits in self.edits.items()}
+
+    def discard(self, cells=None):
+        """Drops buffered edits: all of them, or those of a snapshot() still unchanged"""
+        if cells is None:
+            self.edits.clear()
+        for key, edits in (cells or {}).items():
+            current = self.edits.get(key, {})
+            for column, text in edits.items():
+                if current.get(column) == text:
+                    del current[column]
+            if not current:
+                self.edits.pop(key, None)
+        self._originals = {k: v for k, v in self._originals.items() if k in self.edits}
+        self.invalid = {(k, c) for k, c in self.invalid if c in self.edits.get(k, {})}
+        self._cell = None
+        self.view.reload(self.view.total)
+        if self.on_edit:
+            self.on_edit()
+
+    def _store(self, cell, text):
+        """Records text as the edit of cell, or drops the edit if text is the stored value"""
+        if cell[0] not in self._originals:
+            return
+        key, column = cell
+        text = text.strip()
+        original = str(self._originals[key][self.columns.index(column)])
+        edits = self.edits.setdefault(key, {})
+        if text == original:
+            edits.pop(column, None)
+        else:
+            edits[column] = text
+        if not edits:
+            del self.edits[key]
+        self.invalid.discard((key, column))
+        if column in edits:
+            try:
+                self.parse(text)
+            except ValueError:
+                self.invalid.add((key, column))
+        self.view.update_rows(self.view.total, {key: self._display(key, self._originals[key])})
+        if self.on_edit:
+            self.on_edit()
+
+    def revert(self):
+        if self._cell is None:
+            return
+        key, column = self._cell
+        self.edits.get(key, {}).pop(column, None)
+        if key in self.edits and not self.edits[key]:
+            del self.edits[key]
+        self.invalid.discard((key, column))
+        if key in self._originals:
+            self.view.update_rows(self.view.total, {key: self._display(key, self._originals[key])})
+        self._cell = None
+        self._place()
+        if self.on_edit:
+            self.on_edit()
+
+    # ---------- active cell ----------
+    def move(self, rows, cols):
+        self.commit()
+        self._cell = None
+        col = self.col + cols
+        rows += col // len(self.editable)          # Tab past the last column wraps to the next row
+        self.col = col % len(self.editable)
+        self.row = max(0, min(self.row + rows, self.view.total - 1))
+        if self.row < self.view.top:
+            self.view.scroll_to(self.row)
+        elif self.row >= self.view.top + self.view.visible:
+            self.view.scroll_to(self.row - self.view.visible + 1)
+        self._place(focus=True)
+
+    def _on_click(self, event):
+        item, column = self.tree.identify_row(event.y), self.tree.identify_column(event.x)
+        index = self.view.index_of(item)
+        name = self.columns[int(column[1:]) - 1] if column and column[1:].isdigit() else None
+        if index is None or name not in self.editable:
+            return None
+        self.commit()
+        self._cell = None
+        self.row, self.col = index, self.editable.index(name)
+        self._place(focus=True)
+        return "break"
+
+    def _place(self, focus=False):
+        cell = self.view.row_at(self.row) if self.columns else None
+        bbox = cell and cell[1] is not None and self.tree.bbox(cell[0], self.editable[self.col])
+        if not bbox:                 # off screen, not loaded yet, or tab hidden
+            self.entry.place_forget()
+            return
+        slot, key = cell
+        column = self.editable[self.col]
+        if self._cell != (key, column):
+            values = self.tree.item(slot, "values")
+            if key not in self._originals and key not in self.edits:
+                self._originals[key] = values
+            # switch first: storing the old cell redraws the view, which lands back here.
+            # previous is None when move/click already committed it or discard/revert dropped it
+            previous, self._cell = self._cell, (key, column)
+            if previous is not None:
+                self._store(previous, self.entry.get())
+            self.entry.delete(0, "end")
+            self.entry.insert(0, values[self.columns.index(column)])
+            self.entry.select_range(0, "end")
+        x, y, width, height = bbox
+        self.entry.place(x=x, y=y, width=width, height=height)
+        if focus:
+            self.entry.focus_set()
+
+
+class FilterBar:
+    """One filter entry per column; calls on_change({column: text}) once typing pauses"""
+
+    def __init__(self, parent, on_change, delay=300, per_row=6, bg="#1e293b"):
+        self.on_change = on_change
+        self.delay = delay
+        self.per_row = per_row
+        self.bg = bg
+        self.frame = tk.Frame(parent, bg=bg)
+        self.frame.pack(fill="x", padx=40)
+        self.vars = {}
+        self._after = None
+
+    def set_columns(self, columns):
+        if list(self.vars) == list(columns):
+            return
+        for widget in self.frame.winfo_children():
+            widget.destroy()
+        self.vars = {}
+        for i, col in enumerate(columns):
+            row, pos = divmod(i, self.per_row)
+            tk.Label(self.frame, text=col.title(), font=("Helvetica", 11), bg=self.bg, fg="#94a3b8").grid(
+                row=2 * row, column=pos, sticky="w", padx=6)
+            var = tk.StringVar()
+            var.trace_add("write", lambda *args: self._schedule())
+            tk.Entry(self.frame, textvariable=var, font=("Helvetica", 12), width=16).grid(
+                row=2 * row + 1, column=pos, sticky="we", padx=6, pady=(0, 6))
+            self.vars[col] = var
+
+    def filters(self):
+        return {col: var.get() for col, var in self.vars.items() if var.get().strip()}
+
+    def _schedule(self):
+        if self._after:
+            self.frame.after_cancel(self._after)
+        self._after = self.frame.after(self.delay, self._fire)
+
+    def _fire(self):
+        self._after = None
+        self.on_change(self.filters())
+
+
+class _CardSlot:
+    __slots__ = ("frame", "item", "index")
+
+    def __init__(self, frame, item):
+        self.frame = frame
+        self.item = item
+        self.index = None
+
+
+class VirtualCardList:
+    """Scrollable card list backed by a fixed pool of recycled card widgets.
+
+    build(parent) creates one empty card frame, fill(frame, key, values)
+    rebinds it to a row. Rows are loaded lazily, a page at a time, from
+    fetch(offset, limit) -> [(key, values), ...], off the UI thread when an
+    executor is given.
+    """
+
+    def __init__(self, parent, build, fill, pad_x=100, pad_y=18, page_size=50, max_pages=20,
+                 executor=None, **pack):
+        self.build = build
+        self.fill = fill
+        self.executor = executor
+        self.pad_x = pad_x
+        self.pad_y = pad_y
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, yscrollincrement=40)
+        self.scrollbar = ttk.Scrollbar(parent, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.pack(side="left", fill="both", expand=True, **pack)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.fetch = None
+        self.total = 0
+        self.row_h = None
+        self._slots = []
+        self._pages = OrderedDict()
+        self._loading = set()
+        self._gen = 0
+        self._layout_pending = False
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind_all(seq, self._on_wheel, add="+")
+
+    # ---------- data source ----------
+    def set_source(self, total, fetch):
+        """Shows a new row set from the top"""
+        self.fetch = fetch
+        self.total = total
+        self._pages.clear()
+        self._loading.clear()
+        self._gen += 1
+        for slot in self._slots:
+            slot.index = None
+        self._update_scrollregion()
+        self.canvas.yview_moveto(0)
+        self._schedule_layout()
+
+    def row(self, index):
+        """(key, values) for a row index, loading its page on demand (None while loading)"""
+        page_no, pos = divmod(index, self.page_size)
+        page = self._pages.get(page_no)
+        if page is None:
+            if self.executor is not None:
+                self._request_page(page_no)
+                return None
+            page = self.fetch(page_no * self.page_size, self.page_size)
+            self._store_page(page_no, page)
+        else:
+            self._pages.move_to_end(page_no)
+        return page[pos] if pos < len(page) else None
+
+    def _store_page(self, page_no, page):
+        self._pages[page_no] = page
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def _request_page(self, page_no):
+        if page_no in self._loading:
+            return
+        self._loading.add(page_no)
+
+        def loaded(page, gen=self._gen):
+            if gen != self._gen:
+                return
+            self._loading.discard(page_no)
+            self._store_page(page_no, page)
+            self._schedule_layout()
+
+        self.executor.submit(self.fetch, page_no * self.page_size, self.page_size, on_done=loaded)
+
+    def update_row(self, key, values):
+        """Patches one loaded row in place; only its card (if on screen) is refilled"""
+        for page_no, page in self._pages.items():
+            for pos, (k, _) in enumerate(page):
+                if k == key:
+                    page[pos] = (key, values)
+                    index = page_no * self.page_size + pos
+                    for slot in self._slots:
+                        if slot.index == index:
+                            self.fill(slot.frame, key, values)
+                    return
+
+    def append_rows(self, count=1):
+        """Grows the list for rows added at the end, keeping the scroll position"""
+        if self.total:
+            self._pages.pop((self.total - 1) // self.page_size, None)
+        self.total += count
+        self._update_scrollregion()
+        self._schedule_layout()
+
+    # ---------- layout ----------
+    def _new_slot(self):
+        frame = self.build(self.canvas)
+        item = self.canvas.create_window(self.pad_x, 0, window=frame, anchor="nw", state="hidden",
+                                         width=max(1, self.canvas.winfo_width() - 2 * self.pad_x))
+        slot = _CardSlot(frame, item)
+        self._slots.append(slot)
+        return slot
+
+    def _measure(self):
+        if self.row_h is None:
+            slot = self._slots[0] if self._slots else self._new_slot()
+            slot.frame.update_idletasks()
+            self.row_h = slot.frame.winfo_reqheight() + 2 * self.pad_y
+            self._update_scrollregion()
+
+    def _update_scrollregion(self):
+        height = self.total * (self.row_h or 0)
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), max(height, 1)))
+
+    def _schedule_layout(self):
+        if not self._layout_pending:
+            self._layout_pending = True
+            self.canvas.after_idle(self._layout)
+
+    @traced("tk")
+    def _layout(self):
+        self._layout_pending = False
+        if self.fetch is None:
+            return
+        self._measure()
+        needed = self.canvas.winfo_height() // self.row_h + 2
+        while len(self._slots) < needed:
+            self._new_slot()
+
+        first = int(self.canvas.canvasy(0) // self.row_h)
+        for i in range(first, first + len(self._slots)):
+            slot = self._slots[i % len(self._slots)]
+            row = self.row(i) if i < self.total else None
+            if row is None:
+                self.canvas.itemconfigure(slot.item, state="hidden")
+                slot.index = None
+                continue
+            self.canvas.coords(slot.item, self.pad_x, i * self.row_h + self.pad_y)
+            self.canvas.itemconfigure(slot.item, state="normal")
+            if slot.index != i:
+                self.fill(slot.frame, *row)
+                slot.index = i
+
+    # ---------- events ----------
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_layout()
+
+    def _on_resize(self, event):
+        width = max(1, event.width - 2 * self.pad_x)
+        for slot in self._slots:
+            self.canvas.itemconfigure(slot.item, width=width)
+        self._update_scrollregion()
+        self._schedule_layout()
+
+    def _on_wheel(self, event):
+        # bound application-wide, so only react while the pointer is over this list
+        under = self.canvas.winfo_containing(event.x_root, event.y_root)
+        path = str(self.canvas)
+        if under is None or not (str(under) == path or str(under).startswith(path + ".")):
+            return
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-3, "units")
+        else:
+            self.canvas.yview_scroll(3, "units")
+
+
+class TraceOverlay:
+    """Small always-on-top window listing the traced operations with the
+    most recent time spent, refreshed every `interval` ms; F12 toggles it"""
+
+    HEADER = f"{'kind':<5} {'operation':<58} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8}"
+
+    def __init__(self, root, interval=1000, rows=12):
+        self.root = root
+        self.interval = interval
+        self.rows = rows
+        self.window = None
+        self._after = None
+        root.bind_all("<F12>", lambda e: self.toggle())
+
+    @classmethod
+    def attach(cls, root):
+        """Binds the overlay to root when tracing is on; returns it, or None"""
+        return cls(root) if TRACER.enabled else None
+
+    def toggle(self):
+        if self.window is not None:
+            self.root.after_cancel(self._after)
+            self.window.destroy()
+            self.window = None
+            return
+        self.window = tk.Toplevel(self.root, bg="#0f172a")
+        self.window.title("Hot spots (ms)")
+        self.window.attributes("-topmost", True)
+        self.window.protocol("WM_DELETE_WINDOW", self.toggle)
+        self.text = tk.Label(self.window, font=("Courier", 11), bg="#0f172a", fg="#e2e8f0",
+                             justify="left", anchor="nw", padx=12, pady=10)
+        self.text.pack(fill="both", expand=True)
+        self._refresh()
+
+    def _refresh(self):
+        lines = [self.HEADER]
+        for (kind, name), s in TRACER.hot_spots(self.rows):
+            name = name if len(name) <= 58 else name[:55] + "..."
+            lines.append(f"{kind:<5} {name:<58} {s['count']:>6} {s['p50']:>8.2f} {s['p95']:>8.2f} {s['p99']:>8.2f}")
+        self.text.config(text="\n".join(lines))
+        self._after = self.root.after(self.interval, self._refresh)